@@ -1,52 +1,59 @@
+import json
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
 from fastapi import APIRouter, Depends, FastAPI, File, HTTPException, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 
 from backend.core.config import Settings
 from backend.core.dependency import (
+    get_app_ingest_jobs,
+    get_app_store_handle,
     get_settings,
-    get_vector_store,
+    get_summary_cache,
     get_model,
     get_docstore,
+    get_file_service,
 )
 from backend.models.schemas import (
     ChatRequest,
     ChatResponse,
+    DocumentDeleteResponse,
     HealthResponse,
+    IngestJobStatus,
     IngestRequest,
     IngestResponse,
 )
 from backend.servies.chat_service import ChatService
-from backend.servies.file_service import PDFFileService
+from backend.servies.ingest_jobs import IngestJobManager, IngestQueueFull
 from backend.servies.model_service import ModelService
+from backend.utils.store_handle import VectorStoreHandle
 
 router = APIRouter(prefix="/api")
 
 def get_service(
     cfg: Settings = Depends(get_settings),
+    handle: VectorStoreHandle = Depends(get_app_store_handle),
 ) -> ChatService:
-    vector_store = get_vector_store(cfg)
     docstore = get_docstore(cfg)
-    file_service = PDFFileService()
+    file_service = get_file_service(cfg)
     model_service: ModelService = get_model(cfg)
     return ChatService(
         cfg=cfg,
-        vector_store=vector_store,
+        vector_store=handle.store,
         file_service=file_service,
         model_service=model_service,
         docstore=docstore,
+        store_lock=handle.lock,
+        summary_cache=get_summary_cache(cfg),
     )
 
 
-@router.post("/ingest", response_model=IngestResponse)
-async def ingest(
-    payload: IngestRequest = Depends(),
-    file: Optional[UploadFile] = File(None),
-    svc: ChatService = Depends(get_service),
-):
+async def _resolve_target(
+    payload: IngestRequest, file: Optional[UploadFile], cfg: Settings
+) -> Path:
     target_path: Optional[Path] = None
-    cfg = svc.cfg
 
     if file:
         target_path = cfg.upload_dir / file.filename
@@ -59,16 +66,91 @@ async def ingest(
         raise HTTPException(
             status_code=400, detail="Provide a PDF via file upload or file_path."
         )
+    return target_path
+
+
+@router.post("/ingest", response_model=IngestResponse)
+async def ingest(
+    payload: IngestRequest = Depends(),
+    file: Optional[UploadFile] = File(None),
+    svc: ChatService = Depends(get_service),
+):
+    target_path = await _resolve_target(payload, file, svc.cfg)
 
     try:
-        return svc.ingest(str(target_path))
+        return await svc.aingest(str(target_path))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+@router.post("/ingest/jobs", response_model=IngestJobStatus, status_code=202)
+async def submit_ingest_job(
+    payload: IngestRequest = Depends(),
+    file: Optional[UploadFile] = File(None),
+    svc: ChatService = Depends(get_service),
+    jobs: IngestJobManager = Depends(get_app_ingest_jobs),
+):
+    """Queue an ingest and return immediately; poll GET /api/ingest/{job_id}."""
+    target_path = await _resolve_target(payload, file, svc.cfg)
+    try:
+        job = jobs.submit(svc, str(target_path))
+    except IngestQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    return job.snapshot()
+
+
+@router.get("/ingest/{job_id}", response_model=IngestJobStatus)
+def get_ingest_job(job_id: str, jobs: IngestJobManager = Depends(get_app_ingest_jobs)):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job {job_id}")
+    return job.snapshot()
+
+
+@router.delete("/ingest/{job_id}", response_model=IngestJobStatus)
+def cancel_ingest_job(job_id: str, jobs: IngestJobManager = Depends(get_app_ingest_jobs)):
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job {job_id}")
+    return job.snapshot()
+
+
+@router.delete("/documents/{source}", response_model=DocumentDeleteResponse)
+def delete_document(source: str, svc: ChatService = Depends(get_service)):
+    """Remove a document (all ingested versions) from the index, docstore and registry."""
+    result = svc.delete_document(source)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No ingested document named {source}")
+    return result
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(req: ChatRequest, svc: ChatService = Depends(get_service)):
     try:
-        return svc.answer(req.question, req.k)
+        return await svc.aanswer(req.question, req.k)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(req: ChatRequest, svc: ChatService = Depends(get_service)):
+    """Server-Sent Events: one `context` event, then `token` events, then `done`."""
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event, data in svc.astream_answer(req.question, req.k):
+                yield _sse(event, data)
+        except Exception as exc:
+            yield _sse("error", str(exc))
+            return
+        yield _sse("done", None)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
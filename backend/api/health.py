@@ -1,18 +1,29 @@
 from fastapi import APIRouter, Depends
 
 from backend.core.config import Settings
-from backend.core.dependency import get_settings, get_vector_store, get_model
+from backend.core.dependency import get_app_store_handle, get_settings, get_model
 from backend.models.schemas import HealthResponse
+from backend.utils.store_handle import VectorStoreHandle
 
 router = APIRouter(prefix="/api")
 
 
+def _live_vectors(store: object) -> int:
+    """Indexed vectors minus tombstoned (deleted but not yet purged) ones."""
+    live = getattr(store, "live_count", None)
+    if live is not None:
+        return live
+    index = getattr(store, "index", None)
+    return index.ntotal if index is not None else 0
+
+
 @router.get("/health", response_model=HealthResponse)
-def health(cfg: Settings = Depends(get_settings)):
+def health(
+    cfg: Settings = Depends(get_settings),
+    handle: VectorStoreHandle = Depends(get_app_store_handle),
+):
     model_service = get_model(cfg)
-    store = get_vector_store(cfg)
-    ntotal = getattr(store, "index", None)
-    count = ntotal.ntotal if ntotal is not None else 0
+    count = _live_vectors(handle.store)
     embedding_ready = False
     chat_ready = False
     chat_model_name = None
@@ -25,7 +36,8 @@ def health(cfg: Settings = Depends(get_settings)):
     except Exception:
         chat_ready = False
     try:
-        embedder = model_service.get_embedder()
+        # Bypass the embedding cache so this really reaches Ollama.
+        embedder = model_service.get_raw_embedder()
         embedder.embed_query("health check")
         embedding_ready = True
     except Exception:
@@ -35,4 +47,5 @@ def health(cfg: Settings = Depends(get_settings)):
         config={**cfg.model_dump(), "vectors": count, "chat_model": chat_model_name},
         embedding_ready=embedding_ready,
         chat_ready=chat_ready,
+        embedding_cache=model_service.embedding_cache_stats(),
     )
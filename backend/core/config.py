@@ -27,8 +27,67 @@ class Settings:
             os.environ.get("DATA_DIR", Path.cwd() / "storage")
         ).resolve()
         self.vector_store_path: Path = self.data_dir / "vector_store"
+        # Wipe vector store, docstore and registry at startup; persistent (warm load)
+        # everywhere but APP_ENV=local unless set explicitly.
+        self.reset_stores_on_start: bool = (
+            os.environ.get(
+                "RESET_STORES_ON_START", "true" if self.env == "local" else "false"
+            ).lower()
+            == "true"
+        )
+        # Embedding model and dimension the persisted vectors were built with.
+        self.store_manifest_path: Path = self.data_dir / "store_manifest.json"
+        # Segments appended since the last full snapshot before compaction kicks in.
+        self.vector_compact_segments: int = int(
+            os.environ.get("VECTOR_COMPACT_SEGMENTS", "20")
+        )
+        # ANN index: flat | hnsw | ivf | ivfpq | sq8 | ivfsq8. Stores start Flat and
+        # migrate at the threshold; quantised types re-rank on full-precision vectors.
+        self.vector_index_type: str = os.environ.get("VECTOR_INDEX", "flat").lower()
+        self.vector_index_migrate_at: int = int(
+            os.environ.get("VECTOR_INDEX_MIGRATE_AT", "10000")
+        )
+        self.hnsw_m: int = int(os.environ.get("HNSW_M", "32"))
+        self.hnsw_ef_construction: int = int(os.environ.get("HNSW_EF_CONSTRUCTION", "80"))
+        self.hnsw_ef_search: int = int(os.environ.get("HNSW_EF_SEARCH", "64"))
+        self.ivf_nlist: int = int(os.environ.get("IVF_NLIST", "0"))  # 0 = ~4*sqrt(n)
+        self.ivf_nprobe: int = int(os.environ.get("IVF_NPROBE", "16"))
+        self.ivf_train_size: int = int(os.environ.get("IVF_TRAIN_SIZE", "50000"))
+        self.pq_m: int = int(os.environ.get("PQ_M", "0"))  # 0 = dim / 8 sub-vectors
+        self.pq_nbits: int = int(os.environ.get("PQ_NBITS", "8"))
+        self.vector_rerank_factor: int = int(os.environ.get("VECTOR_RERANK_FACTOR", "4"))
+        # Deleted vectors stay as tombstones until they make up this share of the
+        # index, then it is rebuilt from the live vectors (0 disables).
+        self.vector_tombstone_ratio: float = float(
+            os.environ.get("VECTOR_TOMBSTONE_RATIO", "0.2")
+        )
+        # Memory-map the base index at startup (shared page cache across workers);
+        # it is read into memory before the first write.
+        self.vector_mmap: bool = os.environ.get("VECTOR_MMAP", "true").lower() == "true"
         self.upload_dir: Path = self.data_dir / "uploads"
         self.docstore_path: Path = self.data_dir / "docstore.json"
+        # "sqlite" (default) or "json"; sqlite imports a legacy docstore.json once.
+        self.docstore_backend: str = os.environ.get("DOCSTORE_BACKEND", "sqlite").lower()
+        self.docstore_sqlite_path: Path = self.data_dir / "docstore.sqlite3"
+        # Extracted figures by content hash; image parents hold a reference, not base64.
+        self.blob_store_dir: Path = self.data_dir / "blobs"
+        # Ingested files by content hash; re-uploading a known file is a no-op.
+        self.document_registry_path: Path = self.data_dir / "documents.sqlite3"
+        # A new version of an already ingested source only processes changed chunks.
+        self.reingest_incremental: bool = (
+            os.environ.get("REINGEST_INCREMENTAL", "true").lower() == "true"
+        )
+        self.summary_cache_path: Path = self.data_dir / "summary_cache.sqlite3"
+        self.summary_cache_enabled: bool = (
+            os.environ.get("SUMMARY_CACHE", "true").lower() == "true"
+        )
+        self.embedding_cache_path: Path = self.data_dir / "embedding_cache.sqlite3"
+        self.embedding_cache_enabled: bool = (
+            os.environ.get("EMBEDDING_CACHE", "true").lower() == "true"
+        )
+        self.embedding_query_cache_size: int = int(
+            os.environ.get("EMBEDDING_QUERY_CACHE_SIZE", "1024")
+        )
         self.log_dir: Path = self.data_dir / "logs"
         self.log_level: str = os.environ.get("LOG_LEVEL", "INFO").upper()
         self.log_to_file: bool = (
@@ -45,6 +104,112 @@ class Settings:
             "OLLAMA_BASE_URL", "http://localhost:11434"
         )
         self.search_k: int = int(os.environ.get("SEARCH_K", "4"))
+        # Summarisation policy: "llm" | "extractive" (text only) | "raw" (embed chunks as-is).
+        # Chunks shorter than SUMMARY_MIN_CHARS (0 = off, opt-in) and modalities left
+        # out of SUMMARY_MODALITIES skip the chat model.
+        self.summary_mode: str = os.environ.get("SUMMARY_MODE", "llm").lower()
+        self.summary_modalities: list[str] = [
+            m.strip().lower()
+            for m in os.environ.get("SUMMARY_MODALITIES", "text,table,image").split(",")
+            if m.strip()
+        ]
+        self.summary_min_chars: int = int(os.environ.get("SUMMARY_MIN_CHARS", "0"))
+        self.summary_extractive_sentences: int = int(
+            os.environ.get("SUMMARY_EXTRACTIVE_SENTENCES", "3")
+        )
+        # Summaries waiting for the embedder before summarisation pauses (pipeline back-pressure).
+        self.ingest_pipeline_queue_size: int = int(
+            os.environ.get("INGEST_PIPELINE_QUEUE_SIZE", "64")
+        )
+        # Upper bounds on in-flight Ollama calls per stage; the live limit adapts
+        # below them (halved on errors or latency spikes, regrown on success).
+        self.summary_max_concurrency: int = int(
+            os.environ.get("SUMMARY_MAX_CONCURRENCY", "4")
+        )
+        self.image_max_concurrency: int = int(os.environ.get("IMAGE_MAX_CONCURRENCY", "2"))
+        # Figures are downscaled and re-encoded as JPEG in worker threads before the
+        # vision call; those under IMAGE_MIN_AREA pixels are sent unchanged.
+        self.image_prep_enabled: bool = os.environ.get("IMAGE_PREP", "true").lower() == "true"
+        self.image_max_edge: int = int(os.environ.get("IMAGE_MAX_EDGE", "1024"))
+        self.image_jpeg_quality: int = int(os.environ.get("IMAGE_JPEG_QUALITY", "85"))
+        self.image_grayscale: bool = os.environ.get("IMAGE_GRAYSCALE", "false").lower() == "true"
+        self.image_min_area: int = int(os.environ.get("IMAGE_MIN_AREA", str(256 * 256)))
+        self.image_prep_workers: int = int(os.environ.get("IMAGE_PREP_WORKERS", "4"))
+        # Near-identical figures (dHash within IMAGE_DEDUP_MAX_DISTANCE bits) are summarised
+        # once per document; ones below the decorative size limits are dropped.
+        self.image_dedup_enabled: bool = os.environ.get("IMAGE_DEDUP", "true").lower() == "true"
+        self.image_dedup_max_distance: int = int(os.environ.get("IMAGE_DEDUP_MAX_DISTANCE", "4"))
+        self.image_decorative_min_edge: int = int(
+            os.environ.get("IMAGE_DECORATIVE_MIN_EDGE", "16")
+        )
+        self.image_decorative_min_area: int = int(
+            os.environ.get("IMAGE_DECORATIVE_MIN_AREA", str(64 * 64))
+        )
+        self.embedding_max_concurrency: int = int(
+            os.environ.get("EMBEDDING_MAX_CONCURRENCY", "2")
+        )
+        self.embedding_batch_size: int = int(os.environ.get("EMBEDDING_BATCH_SIZE", "64"))
+        self.llm_max_retries: int = int(os.environ.get("LLM_MAX_RETRIES", "2"))
+        # A call slower than this multiple of the running average counts as a spike.
+        self.llm_latency_backoff_factor: float = float(
+            os.environ.get("LLM_LATENCY_BACKOFF_FACTOR", "3.0")
+        )
+        # Background ingest jobs: worker threads and max jobs waiting or running.
+        self.ingest_workers: int = int(os.environ.get("INGEST_WORKERS", "1"))
+        self.ingest_queue_size: int = int(os.environ.get("INGEST_QUEUE_SIZE", "8"))
+        # PDF partitioning: >1 worker splits the file into page ranges handled in parallel.
+        self.pdf_workers: int = int(os.environ.get("PDF_WORKERS", "1"))
+        self.pdf_pages_per_batch: int = int(
+            os.environ.get("PDF_PAGES_PER_BATCH", "10")
+        )
+        # "auto" uses the fast text-layer path for pages with enough embedded text and
+        # no images or ruled tables, hi_res (layout + OCR) elsewhere; or force either.
+        self.pdf_strategy: str = os.environ.get("PDF_STRATEGY", "auto").lower()
+        self.pdf_text_layer_min_chars: int = int(
+            os.environ.get("PDF_TEXT_LAYER_MIN_CHARS", "100")
+        )
+        # Raw partition_pdf elements per file hash; kept across store resets so
+        # re-chunking with new CHUNK_* values skips layout detection and OCR.
+        self.partition_cache_dir: Path = self.data_dir / "partition_cache"
+        self.partition_cache_enabled: bool = (
+            os.environ.get("PARTITION_CACHE", "true").lower() == "true"
+        )
+        self.chunk_max_characters: int = int(os.environ.get("CHUNK_MAX_CHARACTERS", "2000"))
+        self.chunk_combine_under_n_chars: int = int(
+            os.environ.get("CHUNK_COMBINE_UNDER_N_CHARS", "1500")
+        )
+        self.chunk_new_after_n_chars: int = int(
+            os.environ.get("CHUNK_NEW_AFTER_N_CHARS", "5000")
+        )
+        self._check_index_training()
+
+    def min_training_vectors(self, kind: str) -> int:
+        """Fewest vectors that can train an index of ``kind`` (0 when it needs no training).
+
+        IVF k-means needs at least one point per list; PQ needs 2**PQ_NBITS
+        points per sub-quantiser codebook.
+        """
+        if kind not in ("ivf", "ivfpq", "ivfsq8", "sq8"):
+            return 0
+        minimum = 1
+        if kind != "sq8":
+            minimum = max(minimum, self.ivf_nlist)
+        if kind == "ivfpq":
+            minimum = max(minimum, 2**self.pq_nbits)
+        return minimum
+
+    def _check_index_training(self) -> None:
+        minimum = self.min_training_vectors(self.vector_index_type)
+        if self.ivf_train_size < minimum:
+            raise ValueError(
+                f"IVF_TRAIN_SIZE={self.ivf_train_size} is below the {minimum} vectors "
+                f"VECTOR_INDEX={self.vector_index_type} needs for training"
+            )
+        if 0 < self.vector_index_migrate_at < minimum:
+            raise ValueError(
+                f"VECTOR_INDEX_MIGRATE_AT={self.vector_index_migrate_at} is below the {minimum} "
+                f"vectors VECTOR_INDEX={self.vector_index_type} needs for training"
+            )
 
     def ensure_dirs(self) -> None:
         """Create required directories if they do not exist."""
@@ -59,8 +224,34 @@ class Settings:
             "env": self.env,
             "data_dir": str(self.data_dir),
             "vector_store_path": str(self.vector_store_path),
+            "reset_stores_on_start": self.reset_stores_on_start,
+            "store_manifest_path": str(self.store_manifest_path),
+            "vector_compact_segments": self.vector_compact_segments,
+            "vector_index_type": self.vector_index_type,
+            "vector_index_migrate_at": self.vector_index_migrate_at,
+            "hnsw_m": self.hnsw_m,
+            "hnsw_ef_construction": self.hnsw_ef_construction,
+            "hnsw_ef_search": self.hnsw_ef_search,
+            "ivf_nlist": self.ivf_nlist,
+            "ivf_nprobe": self.ivf_nprobe,
+            "ivf_train_size": self.ivf_train_size,
+            "pq_m": self.pq_m,
+            "pq_nbits": self.pq_nbits,
+            "vector_rerank_factor": self.vector_rerank_factor,
+            "vector_tombstone_ratio": self.vector_tombstone_ratio,
+            "vector_mmap": self.vector_mmap,
             "upload_dir": str(self.upload_dir),
             "docstore_path": str(self.docstore_path),
+            "docstore_backend": self.docstore_backend,
+            "docstore_sqlite_path": str(self.docstore_sqlite_path),
+            "blob_store_dir": str(self.blob_store_dir),
+            "document_registry_path": str(self.document_registry_path),
+            "reingest_incremental": self.reingest_incremental,
+            "summary_cache_path": str(self.summary_cache_path),
+            "summary_cache_enabled": self.summary_cache_enabled,
+            "embedding_cache_path": str(self.embedding_cache_path),
+            "embedding_cache_enabled": self.embedding_cache_enabled,
+            "embedding_query_cache_size": self.embedding_query_cache_size,
             "log_dir": str(self.log_dir),
             "log_level": self.log_level,
             "log_to_file": self.log_to_file,
@@ -69,6 +260,38 @@ class Settings:
             "chat_model": self.chat_model,
             "ollama_base_url": self.ollama_base_url,
             "search_k": self.search_k,
+            "summary_mode": self.summary_mode,
+            "summary_modalities": self.summary_modalities,
+            "summary_min_chars": self.summary_min_chars,
+            "summary_extractive_sentences": self.summary_extractive_sentences,
+            "ingest_pipeline_queue_size": self.ingest_pipeline_queue_size,
+            "summary_max_concurrency": self.summary_max_concurrency,
+            "image_max_concurrency": self.image_max_concurrency,
+            "image_prep_enabled": self.image_prep_enabled,
+            "image_max_edge": self.image_max_edge,
+            "image_jpeg_quality": self.image_jpeg_quality,
+            "image_grayscale": self.image_grayscale,
+            "image_min_area": self.image_min_area,
+            "image_prep_workers": self.image_prep_workers,
+            "image_dedup_enabled": self.image_dedup_enabled,
+            "image_dedup_max_distance": self.image_dedup_max_distance,
+            "image_decorative_min_edge": self.image_decorative_min_edge,
+            "image_decorative_min_area": self.image_decorative_min_area,
+            "embedding_max_concurrency": self.embedding_max_concurrency,
+            "embedding_batch_size": self.embedding_batch_size,
+            "llm_max_retries": self.llm_max_retries,
+            "llm_latency_backoff_factor": self.llm_latency_backoff_factor,
+            "ingest_workers": self.ingest_workers,
+            "ingest_queue_size": self.ingest_queue_size,
+            "pdf_workers": self.pdf_workers,
+            "pdf_pages_per_batch": self.pdf_pages_per_batch,
+            "pdf_strategy": self.pdf_strategy,
+            "pdf_text_layer_min_chars": self.pdf_text_layer_min_chars,
+            "partition_cache_dir": str(self.partition_cache_dir),
+            "partition_cache_enabled": self.partition_cache_enabled,
+            "chunk_max_characters": self.chunk_max_characters,
+            "chunk_combine_under_n_chars": self.chunk_combine_under_n_chars,
+            "chunk_new_after_n_chars": self.chunk_new_after_n_chars,
         }
 
 
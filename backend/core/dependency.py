@@ -1,15 +1,36 @@
 from functools import lru_cache
+import logging
 import shutil
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Sequence
 
-import faiss
+from fastapi import Request
 from langchain_community.vectorstores import FAISS
 from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+from langchain_core.stores import BaseStore
 
 from backend.core.config import Settings, settings
+from backend.servies.file_service import PDFFileService
+from backend.servies.ingest_jobs import IngestJobManager
 from backend.servies.model_service import ModelService, get_model_service
+from backend.utils.adaptive_limiter import AdaptiveLimiter, build_limiters
+from backend.utils.blob_store import BlobStore
+from backend.utils.document_registry import DocumentRegistry
+from backend.utils.faiss_index import apply_search_params, initial_index, migrate_if_needed
+from backend.utils.faiss_segments import SegmentLog
+from backend.utils.faiss_store import RerankingFAISS, purge_if_needed
+from backend.utils.full_vectors import FullPrecisionVectors
+from backend.utils.image_dedup import ImageFilterOptions
+from backend.utils.ingest_claims import IngestClaims
 from backend.utils.json_docstore import JsonDocStore
+from backend.utils.partition_cache import PartitionCache
+from backend.utils.sqlite_docstore import SqliteDocStore, migrate_json_docstore
+from backend.utils.store_handle import VectorStoreHandle
+from backend.utils.store_manifest import StoreManifest, StoreManifestMismatch
+from backend.utils.summary_cache import SummaryCache
+
+logger = logging.getLogger(__name__)
 
 
 @lru_cache
@@ -24,15 +45,50 @@ def get_model(cfg: Optional[Settings] = None) -> ModelService:
     return get_model_service(cfg)
 
 
+@lru_cache
+def get_file_service(cfg: Optional[Settings] = None) -> PDFFileService:
+    cfg = cfg or get_settings()
+    return PDFFileService(
+        max_characters=cfg.chunk_max_characters,
+        combine_text_under_n_chars=cfg.chunk_combine_under_n_chars,
+        new_after_n_chars=cfg.chunk_new_after_n_chars,
+        workers=cfg.pdf_workers,
+        pages_per_batch=cfg.pdf_pages_per_batch,
+        strategy=cfg.pdf_strategy,
+        min_text_chars=cfg.pdf_text_layer_min_chars,
+        partition_cache=get_partition_cache(cfg),
+        blob_store=get_blob_store(cfg),
+        image_filter=ImageFilterOptions.from_settings(cfg),
+    )
+
+
+@lru_cache
+def get_blob_store(cfg: Optional[Settings] = None) -> BlobStore:
+    """Figures referenced by image parents; cleared with the docstore on reset."""
+    cfg = cfg or get_settings()
+    return BlobStore(Path(cfg.blob_store_dir))
+
+
+@lru_cache
+def get_partition_cache(cfg: Optional[Settings] = None) -> Optional[PartitionCache]:
+    """Raw partition output per file; survives store resets like the summary cache."""
+    cfg = cfg or get_settings()
+    if not cfg.partition_cache_enabled:
+        return None
+    return PartitionCache(Path(cfg.partition_cache_dir))
+
+
 def _vector_dim(model_service: ModelService) -> int:
     sample = model_service.get_embedder().embed_query("dimension check")
     return len(sample)
 
 
-def _build_new_store(cfg: Settings, model_service: ModelService) -> FAISS:
-    dim = _vector_dim(model_service)
-    index = faiss.IndexFlatIP(dim)
-    return FAISS(
+def _build_new_store(
+    cfg: Settings, model_service: ModelService, dim: Optional[int] = None
+) -> FAISS:
+    dim = dim or _vector_dim(model_service)
+    index = initial_index(cfg, dim)
+    return RerankingFAISS(
         embedding_function=model_service.get_embedder(),
         index=index,
         docstore=InMemoryDocstore({}),
@@ -41,16 +97,45 @@ def _build_new_store(cfg: Settings, model_service: ModelService) -> FAISS:
     )
 
 
+def _attach_full_vectors(store: RerankingFAISS, cfg: Settings) -> None:
+    """Give the store its on-disk full-precision rows for quantised re-ranking."""
+    store.rerank_factor = cfg.vector_rerank_factor
+    store.full_vectors = FullPrecisionVectors(
+        cfg.vector_store_path / "full_vectors", store.index.d
+    )
+
+
 _STORES_RESET = False
 
 
+def _reset_stores_once(cfg: Settings) -> None:
+    """Honour RESET_STORES_ON_START before the first store is opened in this process."""
+    global _STORES_RESET
+    if _STORES_RESET:
+        return
+    _STORES_RESET = True
+    if cfg.reset_stores_on_start:
+        _reset_stores(cfg)
+    else:
+        logger.info(
+            "Keeping persisted stores under %s (RESET_STORES_ON_START=false)", cfg.data_dir
+        )
+
+
 def _reset_stores(cfg: Settings) -> None:
     """Clear persisted vector_store and docstore for a fresh run."""
-    if cfg.vector_store_path.exists():
-        shutil.rmtree(cfg.vector_store_path, ignore_errors=True)
-    if cfg.docstore_path.exists():
+    for directory in (cfg.vector_store_path, cfg.blob_store_dir):
+        if directory.exists():
+            shutil.rmtree(directory, ignore_errors=True)
+    # The registry describes what the index holds, so it is cleared with it.
+    sqlite_files = [
+        path.with_name(path.name + suffix)
+        for path in (cfg.docstore_sqlite_path, cfg.document_registry_path)
+        for suffix in ("", "-wal", "-shm")
+    ]
+    for path in [cfg.docstore_path, cfg.store_manifest_path, *sqlite_files]:
         try:
-            cfg.docstore_path.unlink()
+            path.unlink()
         except FileNotFoundError:
             pass
     cfg.ensure_dirs()
@@ -61,32 +146,168 @@ def get_vector_store(cfg: Optional[Settings] = None) -> FAISS:
     model_service = get_model(cfg)
     store_path: Path = cfg.vector_store_path
 
-    global _STORES_RESET
-    if not _STORES_RESET:
-        _reset_stores(cfg)
-        _STORES_RESET = True
+    _reset_stores_once(cfg)
 
-    if store_path.exists() and any(store_path.iterdir()):
-        return FAISS.load_local(
-            str(store_path),
+    segments = get_segment_log(cfg)
+    dim = _vector_dim(model_service)
+    if store_path.exists() and segments.exists():
+        # Before anything is read or replayed, so a model change fails with a clear message.
+        manifest = _check_manifest(cfg, dim)
+        # Segments replay before the full vectors attach: their rows are already on disk.
+        store = segments.load(
             model_service.get_embedder(),
-            allow_dangerous_deserialization=True,
+            lambda: _build_new_store(cfg, model_service, dim),
+            store_cls=RerankingFAISS,
+            mmap=cfg.vector_mmap,
         )
+        if manifest is None:
+            _adopt_manifest(store, cfg, dim)
+        _attach_full_vectors(store, cfg)
+        apply_search_params(store.index, cfg)
+        purged = purge_if_needed(store, cfg)
+        if migrate_if_needed(store, cfg) or purged:
+            persist_vector_store(store, cfg)
+        return store
+
+    store = _build_new_store(cfg, model_service, dim)
+    StoreManifest(cfg.embedding_model, dim).write(cfg.store_manifest_path)
+    _attach_full_vectors(store, cfg)
+    return store
 
-    return _build_new_store(cfg, model_service)
 
+def _check_manifest(cfg: Settings, dim: int) -> Optional[StoreManifest]:
+    """Refuse to warm-load vectors built with another embedding model or dimension.
 
-def persist_vector_store(store: FAISS, cfg: Optional[Settings] = None) -> None:
+    ``dim`` is what the configured embedder produces now. Returns None for
+    stores persisted before manifests existed.
+    """
+    manifest = StoreManifest.read(cfg.store_manifest_path)
+    if manifest is not None:
+        manifest.check(cfg.embedding_model, dim)
+    return manifest
+
+
+def _adopt_manifest(store: FAISS, cfg: Settings, dim: int) -> None:
+    """Record the current configuration for a store persisted without a manifest."""
+    if store.index.d != dim:
+        raise StoreManifestMismatch(
+            f"Persisted vector store has dimension {store.index.d} but {cfg.embedding_model!r} "
+            f"produces {dim}; set RESET_STORES_ON_START=true to rebuild it."
+        )
+    logger.warning(
+        "No store manifest at %s; recording %s (dim %d) for the existing vectors",
+        cfg.store_manifest_path,
+        cfg.embedding_model,
+        dim,
+    )
+    StoreManifest(cfg.embedding_model, dim).write(cfg.store_manifest_path)
+
+
+@lru_cache
+def get_segment_log(cfg: Optional[Settings] = None) -> SegmentLog:
+    cfg = cfg or get_settings()
+    return SegmentLog(cfg.vector_store_path)
+
+
+@lru_cache
+def get_store_handle(cfg: Optional[Settings] = None) -> VectorStoreHandle:
+    """Return the process-wide vector store, loading it from disk only once."""
+    cfg = cfg or get_settings()
+    return VectorStoreHandle(store=get_vector_store(cfg))
+
+
+def get_app_store_handle(request: Request) -> VectorStoreHandle:
+    """FastAPI dependency returning the store handle created in the app lifespan."""
+    handle = getattr(request.app.state, "store_handle", None)
+    if handle is None:
+        handle = get_store_handle(get_settings())
+        request.app.state.store_handle = handle
+    return handle
+
+
+def persist_vector_store(
+    store: FAISS,
+    cfg: Optional[Settings] = None,
+    ids: Optional[Sequence[str]] = None,
+    vectors: Optional[Sequence[Sequence[float]]] = None,
+    deleted: Optional[Sequence[str]] = None,
+) -> None:
+    """Append new vectors and deleted ids as a segment; with neither, write a full snapshot.
+
+    Callers hold the store's write lock.
+    """
     cfg = cfg or get_settings()
     cfg.ensure_dirs()
-    store.save_local(str(cfg.vector_store_path))
+    segments = get_segment_log(cfg)
+    if ids is None and deleted is None:
+        segments.compact(store)
+        return
+    ids = list(ids or [])
+    documents: List[Document] = [store.docstore.search(doc_id) for doc_id in ids]
+    segments.append(ids, vectors if ids else [], documents, deleted=deleted or ())
 
 
 @lru_cache
-def get_docstore(cfg: Optional[Settings] = None) -> JsonDocStore:
+def get_docstore(cfg: Optional[Settings] = None) -> BaseStore[str, Document]:
     cfg = cfg or get_settings()
-    global _STORES_RESET
-    if not _STORES_RESET:
-        _reset_stores(cfg)
-        _STORES_RESET = True
-    return JsonDocStore(Path(cfg.docstore_path))
+    _reset_stores_once(cfg)
+    if cfg.docstore_backend == "json":
+        return JsonDocStore(Path(cfg.docstore_path))
+    if cfg.docstore_backend != "sqlite":
+        raise ValueError(f"Unknown DOCSTORE_BACKEND {cfg.docstore_backend!r}")
+    store = SqliteDocStore(Path(cfg.docstore_sqlite_path))
+    migrate_json_docstore(Path(cfg.docstore_path), store)
+    return store
+
+
+@lru_cache
+def get_summary_cache(cfg: Optional[Settings] = None) -> Optional[SummaryCache]:
+    """Persistent summary cache; kept across store resets so re-ingests stay cheap."""
+    cfg = cfg or get_settings()
+    if not cfg.summary_cache_enabled:
+        return None
+    return SummaryCache(Path(cfg.summary_cache_path))
+
+
+@lru_cache
+def get_document_registry(cfg: Optional[Settings] = None) -> DocumentRegistry:
+    cfg = cfg or get_settings()
+    _reset_stores_once(cfg)
+    return DocumentRegistry(Path(cfg.document_registry_path))
+
+
+@lru_cache
+def get_ingest_claims(cfg: Optional[Settings] = None) -> IngestClaims:
+    """Process-wide hash/path claims serialising ingests of the same document."""
+    return IngestClaims()
+
+
+@lru_cache
+def get_limiters(cfg: Optional[Settings] = None) -> Dict[str, AdaptiveLimiter]:
+    """Process-wide concurrency limiters for the summary, image and embedding stages."""
+    cfg = cfg or get_settings()
+    return build_limiters(
+        summary=cfg.summary_max_concurrency,
+        image=cfg.image_max_concurrency,
+        embedding=cfg.embedding_max_concurrency,
+        max_retries=cfg.llm_max_retries,
+        latency_factor=cfg.llm_latency_backoff_factor,
+    )
+
+
+@lru_cache
+def get_ingest_jobs(cfg: Optional[Settings] = None) -> IngestJobManager:
+    cfg = cfg or get_settings()
+    return IngestJobManager(
+        max_workers=cfg.ingest_workers,
+        max_queue=cfg.ingest_queue_size,
+    )
+
+
+def get_app_ingest_jobs(request: Request) -> IngestJobManager:
+    """FastAPI dependency returning the job manager created in the app lifespan."""
+    jobs = getattr(request.app.state, "ingest_jobs", None)
+    if jobs is None:
+        jobs = get_ingest_jobs(get_settings())
+        request.app.state.ingest_jobs = jobs
+    return jobs
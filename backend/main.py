@@ -1,13 +1,26 @@
 """FastAPI application entrypoint that registers API routers."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from backend.api.chat import router as chat_router
 from backend.api.health import router as health_router
+from backend.core.dependency import get_ingest_jobs, get_settings, get_store_handle
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the vector store once; every request shares this in-memory index.
+    cfg = get_settings()
+    app.state.store_handle = get_store_handle(cfg)
+    app.state.ingest_jobs = get_ingest_jobs(cfg)
+    yield
+    app.state.ingest_jobs.shutdown()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="RAG Backend", version="0.1.0")
+    app = FastAPI(title="RAG Backend", version="0.1.0", lifespan=lifespan)
     app.include_router(chat_router)
     app.include_router(health_router)
     return app
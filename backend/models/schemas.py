@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -14,6 +14,52 @@ class IngestResponse(BaseModel):
     processed_pages: int
     chunks_indexed: int
     vector_store_path: str
+    file_hash: Optional[str] = None
+    chunks_reused: int = Field(
+        0, description="Unchanged chunks kept from the previous version of the same source."
+    )
+    chunks_removed: int = Field(
+        0, description="Chunks of the previous version no longer present, now deleted."
+    )
+    duplicate: bool = Field(
+        False, description="True when the file was already ingested and nothing was redone."
+    )
+    summary_mode: Optional[str] = None
+    summaries: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Chunks per summary method: llm, cached, extractive, raw, placeholder.",
+    )
+
+
+class IngestJobStatus(BaseModel):
+    job_id: str
+    file_path: str
+    status: str = Field(..., description="queued, running, completed, failed or cancelled.")
+    stage: str = Field(
+        ..., description="Last stage reached: queued, partitioned, summarised, embedded, persisted."
+    )
+    summarised: int = 0
+    summary_total: int = 0
+    timings: Dict[str, float] = Field(
+        default_factory=dict, description="Seconds spent in each stage, plus total."
+    )
+    result: Optional[IngestResponse] = None
+    error: Optional[str] = None
+
+
+class DocumentDeleteResponse(BaseModel):
+    source: str
+    file_hashes: List[str] = Field(
+        default_factory=list, description="Every ingested version of the source that was removed."
+    )
+    chunks_removed: int
+    files_removed: List[str] = Field(
+        default_factory=list, description="Uploaded copies deleted from the upload directory."
+    )
+    index_rebuilt: bool = Field(
+        False, description="True when tombstones crossed VECTOR_TOMBSTONE_RATIO and were purged."
+    )
+    vectors: int = Field(..., description="Live vectors left in the index.")
 
 
 class ChatRequest(BaseModel):
@@ -37,3 +83,4 @@ class HealthResponse(BaseModel):
     config: dict
     embedding_ready: bool
     chat_ready: bool
+    embedding_cache: Optional[Dict[str, int]] = None
@@ -1,7 +1,11 @@
+import asyncio
+import base64
+import functools
 import logging
 import time
 import uuid
-from typing import List, Optional, Any, Dict
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Any, Dict, Set, Tuple
 
 from langchain.schema import Document
 from langchain_ollama import ChatOllama
@@ -9,18 +13,52 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.messages import HumanMessage
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough
-from langchain_core.vectorstores import VectorStore
-from langchain.retrievers.multi_vector import MultiVectorRetriever
+from langchain_core.stores import BaseStore
+from langchain_community.vectorstores import FAISS
 
 from backend.core.config import Settings
-from backend.core.dependency import persist_vector_store
-from backend.models.schemas import ChatRequest, ChatResponse, ContextChunk, IngestResponse
+from backend.core.dependency import (
+    get_blob_store,
+    get_document_registry,
+    get_ingest_claims,
+    get_limiters,
+    get_segment_log,
+    persist_vector_store,
+)
+from backend.models.schemas import (
+    ChatRequest,
+    ChatResponse,
+    ContextChunk,
+    DocumentDeleteResponse,
+    IngestResponse,
+)
 from backend.servies.interface.chat_interface import ChatInterface
 from backend.servies.interface.file_interface import FileInterface
 from backend.servies.model_service import ModelService
+from backend.servies.summary_policy import SummaryPolicy
+from backend.servies.types import IngestBatch, ModalChunks, ProgressCallback, SummaryTask
 from backend.system_prompts.prompt_v1 import PROMPT, TEXT_SUMMARY_PROMPT, IMAGE_DESCRIPTION_PROMPT
-from backend.utils.json_docstore import JsonDocStore
+from backend.utils.adaptive_limiter import AdaptiveLimiter
+from backend.utils.blob_store import BlobStore, is_blob_ref
+from backend.utils.document_registry import (
+    DocumentRecord,
+    DocumentRegistry,
+    chunk_hash,
+    hash_file,
+)
+from backend.utils.extractive_summary import extractive_summary
+from backend.utils.faiss_index import migrate_if_needed
+from backend.utils.faiss_store import purge_if_needed
+from backend.utils.image_prep import IMAGE_ERRORS, ImagePrepOptions, ImagePrepStats, timed_prepare
+from backend.utils.ingest_claims import IngestClaims
+from backend.utils.store_handle import ReadWriteLock
+from backend.utils.summary_cache import SummaryCache
+
 
+# Queue sentinel closing a pipeline stage.
+_DONE = object()
+# New summaries buffered per task before one summary-cache write.
+_SUMMARY_SAVE_BATCH = 32
 
 DEFAULT_PROMPT = ChatPromptTemplate.from_template(PROMPT)
 SUMMARY_PROMPT = ChatPromptTemplate.from_template(TEXT_SUMMARY_PROMPT)
@@ -44,10 +82,16 @@ class ChatService(ChatInterface):
     def __init__(
         self,
         cfg: Settings,
-        vector_store: VectorStore,
+        vector_store: FAISS,
         file_service: FileInterface,
         model_service: ModelService,
-        docstore: JsonDocStore,
+        docstore: BaseStore[str, Document],
+        store_lock: Optional[ReadWriteLock] = None,
+        summary_cache: Optional[SummaryCache] = None,
+        limiters: Optional[Dict[str, AdaptiveLimiter]] = None,
+        registry: Optional[DocumentRegistry] = None,
+        blob_store: Optional[BlobStore] = None,
+        ingest_claims: Optional[IngestClaims] = None,
     ) -> None:
         self.logger = logging.getLogger(__name__)
         self.cfg = cfg
@@ -55,26 +99,252 @@ class ChatService(ChatInterface):
         self.file_service = file_service
         self.model_service = model_service
         self.docstore = docstore
-        self.retriever = MultiVectorRetriever(
-            vectorstore=self.vector_store,
-            docstore=self.docstore,
-            id_key="doc_id",
-            search_kwargs={"k": self.cfg.search_k},
+        # Shared with other services using the same vector store instance.
+        self.store_lock = store_lock or ReadWriteLock()
+        self.summary_cache = summary_cache
+        # Shared per process by default so concurrent ingests respect one limit.
+        self.limiters = limiters if limiters is not None else get_limiters(cfg)
+        self.summary_policy = SummaryPolicy.from_settings(cfg)
+        self.registry = registry if registry is not None else get_document_registry(cfg)
+        self.blob_store = blob_store if blob_store is not None else get_blob_store(cfg)
+        self.ingest_claims = (
+            ingest_claims if ingest_claims is not None else get_ingest_claims(cfg)
         )
+        self.image_prep = ImagePrepOptions.from_settings(cfg)
+
+    def ingest(
+        self, file_path: str, progress: Optional[ProgressCallback] = None
+    ) -> IngestResponse:
+        """Blocking ingest: runs the pipeline on a private event loop.
+
+        Model calls use the sync clients in threads, because the cached async
+        clients are bound to whichever loop first used them.
+        """
+        return asyncio.run(self._ingest(file_path, progress, native_async=False))
+
+    async def aingest(
+        self, file_path: str, progress: Optional[ProgressCallback] = None
+    ) -> IngestResponse:
+        """Async ingest: LLM calls use the async client; parsing and disk I/O run in threads."""
+        return await self._ingest(file_path, progress, native_async=True)
 
-    def ingest(self, file_path: str) -> IngestResponse:
+    async def _ingest(
+        self, file_path: str, progress: Optional[ProgressCallback], native_async: bool
+    ) -> IngestResponse:
+        # Blobs this ingest stops using (or stored for nothing), swept once it is over.
+        orphans: List[str] = []
+        self.blob_store.begin_write()
+        try:
+            return await self._ingest_file(file_path, progress, native_async, orphans)
+        finally:
+            self.blob_store.end_write()
+            await asyncio.to_thread(self._sweep_blobs, orphans)
+
+    async def _ingest_file(
+        self,
+        file_path: str,
+        progress: Optional[ProgressCallback],
+        native_async: bool,
+        orphans: List[str],
+    ) -> IngestResponse:
         self.logger.info("Ingest started for %s", file_path)
         t_ingest = time.perf_counter()
 
-        modal = self.file_service.load(file_path)
-        if not (modal.texts or modal.tables or modal.images):
-            self.logger.warning("No chunks extracted from %s", file_path)
-            return IngestResponse(
-                processed_pages=0,
-                chunks_indexed=0,
-                vector_store_path=str(self.cfg.vector_store_path),
+        file_hash = await asyncio.to_thread(hash_file, Path(file_path))
+        # Same bytes or same path as a running ingest: wait, then see its record.
+        async with self.ingest_claims.claim(
+            f"hash:{file_hash}", f"path:{Path(file_path).resolve()}"
+        ):
+            return await self._ingest_claimed(
+                file_path, file_hash, progress, native_async, orphans, t_ingest
             )
 
+    async def _ingest_claimed(
+        self,
+        file_path: str,
+        file_hash: str,
+        progress: Optional[ProgressCallback],
+        native_async: bool,
+        orphans: List[str],
+        t_ingest: float,
+    ) -> IngestResponse:
+        existing = await asyncio.to_thread(self.registry.get, file_hash)
+        if existing is not None and existing.chunking == self._chunking_signature:
+            self._report(progress, "persisted")
+            return self._duplicate_response(file_path, existing, t_ingest)
+
+        modal = await asyncio.to_thread(self.file_service.load, file_path)
+        orphans.extend(modal.discarded)
+        self._report(progress, "partitioned")
+        # Same bytes with new chunking options: re-chunk and diff against the old chunks.
+        previous = existing or await asyncio.to_thread(self._previous_version, file_path)
+        if not self._has_chunks(modal, file_path):
+            removed = 0
+            if previous is not None:
+                removed = await asyncio.to_thread(self._retire_previous, previous, file_path)
+            return self._empty_response(chunks_removed=removed)
+
+        summary_stats = {"hits": 0, "misses": 0, "extractive": 0, "raw": 0, "placeholder": 0}
+        state = IngestBatch()
+        fresh = self._diff_previous(modal, previous, state) if previous else modal
+        try:
+            await self._run_pipeline(
+                file_path, fresh, progress, summary_stats, state, native_async
+            )
+            self._report(progress, "embedded")
+            ids = await asyncio.to_thread(self._commit_index, state, file_path)
+        except BaseException:
+            await asyncio.to_thread(self._discard_parents, state)
+            # Figures stored for this version are unused unless another document has them.
+            orphans.extend(d.page_content for d in modal.images)
+            raise
+        orphans.extend(state.removed_blobs)
+        self._report(progress, "persisted")
+        response = self._finish_ingest(
+            file_path, modal, ids, t_ingest, summary_stats, file_hash, state
+        )
+        await asyncio.to_thread(
+            self._register, file_path, file_hash, state, response, previous
+        )
+        return response
+
+    @property
+    def _chunking_signature(self) -> str:
+        return getattr(self.file_service, "chunking_signature", "")
+
+    def _previous_version(self, file_path: str) -> Optional[DocumentRecord]:
+        """Latest registry entry for the same file path, when incremental re-ingest is on.
+
+        Keyed on the full path, not the name: a same-named file from another
+        directory is a different document and must not replace this one's chunks.
+        """
+        if not self.cfg.reingest_incremental:
+            return None
+        # Older records hold the path as given; new ones are resolved.
+        records = self.registry.by_file_path(str(Path(file_path).resolve()), str(file_path))
+        return records[-1] if records else None
+
+    def _diff_previous(
+        self, modal: ModalChunks, previous: DocumentRecord, state: IngestBatch
+    ) -> ModalChunks:
+        """Match chunks against the previous version by content hash; return only new ones.
+
+        Matched chunks keep their doc_ids (their parents are rewritten in case
+        page numbers moved); ids left unmatched are staged for removal.
+        """
+        available = {h: list(ids) for h, ids in previous.chunk_hashes.items()}
+        fresh: Dict[str, List[Document]] = {"text": [], "table": [], "image": []}
+        for modality, chunks in (
+            ("text", modal.texts),
+            ("table", modal.tables),
+            ("image", modal.images),
+        ):
+            for chunk in chunks:
+                digest = chunk_hash(modality, chunk.page_content)
+                ids = available.get(digest)
+                if not ids:
+                    fresh[modality].append(chunk)
+                    continue
+                doc_id = ids.pop(0)
+                state.kept_parents.append((doc_id, self._parent_document(modality, chunk)))
+                state.kept_hashes.setdefault(digest, []).append(doc_id)
+        state.removed_ids = [doc_id for ids in available.values() for doc_id in ids]
+        self.logger.info(
+            "Re-ingest of %s against %s: %d chunks unchanged, %d new, %d removed",
+            previous.source,
+            previous.file_hash[:12],
+            len(state.kept_parents),
+            sum(len(chunks) for chunks in fresh.values()),
+            len(state.removed_ids),
+        )
+        return ModalChunks(fresh["text"], fresh["table"], fresh["image"])
+
+    async def _run_pipeline(
+        self,
+        file_path: str,
+        modal: ModalChunks,
+        progress: Optional[ProgressCallback],
+        summary_stats: Dict[str, int],
+        state: IngestBatch,
+        native_async: bool,
+    ) -> None:
+        """Summarise -> embed -> stage, connected by bounded queues so the stages overlap.
+
+        Summaries of every modality stream into the embedders as they finish,
+        and embedded micro-batches are staged (parents written, vectors kept)
+        while the chat model is still working on the rest.
+        """
+        llm_bound, local = self._apply_summary_policy(modal, summary_stats)
+        tasks = self._summary_tasks(llm_bound)
+        on_summarised = self._summary_counter(
+            sum(len(task.inputs) for task in tasks) + len(local), progress
+        )
+        embed_workers = max(1, self.cfg.embedding_max_concurrency)
+        summarised: asyncio.Queue = asyncio.Queue(
+            maxsize=max(1, self.cfg.ingest_pipeline_queue_size)
+        )
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=embed_workers)
+
+        async def summarise_all() -> None:
+            await asyncio.gather(
+                self._emit_local(local, summarised, on_summarised),
+                *(
+                    self._summarise_stream(
+                        file_path, task, summarised, summary_stats, on_summarised, native_async
+                    )
+                    for task in tasks
+                ),
+            )
+            for _ in range(embed_workers):
+                await summarised.put(_DONE)
+
+        async def embed_all() -> None:
+            await asyncio.gather(
+                *(self._embed_stream(summarised, embedded, state) for _ in range(embed_workers))
+            )
+            await embedded.put(_DONE)
+
+        stages = [
+            asyncio.ensure_future(stage)
+            for stage in (summarise_all(), embed_all(), self._stage_stream(embedded, state))
+        ]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
+        self._log_embeddings(file_path, state)
+
+    @staticmethod
+    def _report(
+        progress: Optional[ProgressCallback],
+        stage: str,
+        done: Optional[int] = None,
+        total: Optional[int] = None,
+    ) -> None:
+        # Callbacks may raise (e.g. IngestCancelled) to stop the ingest between stages.
+        if progress is not None:
+            progress(stage, done, total)
+
+    def _summary_counter(
+        self, total: int, progress: Optional[ProgressCallback]
+    ) -> Callable[[int], None]:
+        done = 0
+
+        def advance(count: int) -> None:
+            nonlocal done
+            done += count
+            self._report(progress, "summarised", done, total)
+
+        advance(0)
+        return advance
+
+    def _has_chunks(self, modal: ModalChunks, file_path: str) -> bool:
+        if not (modal.texts or modal.tables or modal.images):
+            self.logger.warning("No chunks extracted from %s", file_path)
+            return False
         self.logger.info(
             "Modal counts for %s -> text=%d tables=%d images=%d",
             file_path,
@@ -82,100 +352,429 @@ class ChatService(ChatInterface):
             len(modal.tables),
             len(modal.images),
         )
+        return True
 
+    def _empty_response(self, chunks_removed: int = 0) -> IngestResponse:
+        return IngestResponse(
+            processed_pages=0,
+            chunks_indexed=0,
+            vector_store_path=str(self.cfg.vector_store_path),
+            chunks_removed=chunks_removed,
+        )
+
+    def _retire_previous(self, previous: DocumentRecord, file_path: str) -> int:
+        """A new version with no chunks: drop the old version's vectors and record."""
+        state = IngestBatch(removed_ids=list(previous.chunk_ids))
+        self._commit_index(state, file_path)
+        self.registry.delete([previous.file_hash])
+        self._sweep_blobs(state.removed_blobs)
+        self.logger.info(
+            "Removed %d chunks of the previous version of %s (new version is empty)",
+            len(state.removed_ids),
+            file_path,
+        )
+        return len(state.removed_ids)
+
+    def _apply_summary_policy(
+        self, modal: ModalChunks, stats: Dict[str, int]
+    ) -> Tuple[ModalChunks, List[Tuple[str, Document, Optional[str]]]]:
+        """Split chunks into those for the chat model and (modality, chunk, summary) done locally.
+
+        A ``None`` summary makes ``_make_documents`` index the raw chunk (or the
+        image placeholder).
+        """
+        llm_bound: Dict[str, List[Document]] = {"text": [], "table": [], "image": []}
+        local: List[Tuple[str, Document, Optional[str]]] = []
+        for modality, chunks in (
+            ("text", modal.texts),
+            ("table", modal.tables),
+            ("image", modal.images),
+        ):
+            for chunk in chunks:
+                method = self.summary_policy.method(modality, chunk.page_content)
+                if method == "llm":
+                    llm_bound[modality].append(chunk)
+                    continue
+                stats[method] += 1
+                summary = None
+                if method == "extractive":
+                    summary = extractive_summary(
+                        chunk.page_content, self.summary_policy.extractive_sentences
+                    )
+                local.append((modality, chunk, summary))
+        return ModalChunks(llm_bound["text"], llm_bound["table"], llm_bound["image"]), local
+
+    async def _emit_local(
+        self,
+        local: List[Tuple[str, Document, Optional[str]]],
+        outbox: asyncio.Queue,
+        on_done: Callable[[int], None],
+    ) -> None:
+        for item in local:
+            await outbox.put(item)
+            on_done(1)
+
+    def _summary_tasks(self, modal: ModalChunks) -> List[SummaryTask]:
         llm = self.model_service.get_chat_model()
         parser = StrOutputParser()
+        model_name = getattr(llm, "model", None) or self.cfg.chat_model
+        prep_stats = ImagePrepStats() if self.image_prep is not None else None
+        tasks = [
+            SummaryTask(
+                modality="text",
+                chain=SUMMARY_PROMPT | llm | parser,
+                inputs=[{"element": d.page_content} for d in modal.texts],
+                chunks=modal.texts,
+                model_name=model_name,
+                prompt_text=TEXT_SUMMARY_PROMPT,
+            ),
+            SummaryTask(
+                modality="table",
+                chain=SUMMARY_PROMPT | llm | parser,
+                inputs=[{"element": d.page_content} for d in modal.tables],
+                chunks=modal.tables,
+                model_name=model_name,
+                prompt_text=TEXT_SUMMARY_PROMPT,
+            ),
+            # Images go to the vision prompt as a data URI, downscaled and encoded only when sent.
+            SummaryTask(
+                modality="image",
+                chain=IMAGE_PROMPT | llm | parser,
+                inputs=[
+                    {
+                        "image_url": d.page_content,
+                        "mime_type": d.metadata.get("mime_type") or "image/jpeg",
+                    }
+                    for d in modal.images
+                ],
+                chunks=modal.images,
+                model_name=model_name,
+                prompt_text=IMAGE_DESCRIPTION_PROMPT,
+                limiter="image",
+                prepare=functools.partial(self._image_input, stats=prep_stats),
+                prep_stats=prep_stats,
+            ),
+        ]
+        return [task for task in tasks if task.inputs]
 
-        # Summaries for text/table
-        t_summary = time.perf_counter()
-        text_summaries = (
-            SUMMARY_PROMPT | llm | parser
-        ).batch([{"element": d.page_content} for d in modal.texts]) if modal.texts else []
+    def _image_input(
+        self, inputs: Dict[str, Any], stats: Optional[ImagePrepStats] = None
+    ) -> Dict[str, Any]:
+        content, mime_type = inputs["image_url"], inputs["mime_type"]
+        if is_blob_ref(content):
+            data = self.blob_store.get(content)
+            if data is None:
+                raise FileNotFoundError(f"Image blob {content} missing from {self.blob_store.root}")
+        elif self.image_prep is None:
+            # Inline base64 from a file service without a blob store.
+            return {"image_url": f"data:{mime_type};base64,{content}"}
+        else:
+            data = base64.b64decode(content)
+        if self.image_prep is not None and stats is not None:
+            try:
+                data, mime_type = timed_prepare(data, mime_type, self.image_prep, stats)
+            except IMAGE_ERRORS as exc:
+                # Undecodable or oversized figure: let the vision model see the original bytes.
+                self.logger.warning("Image preprocessing failed for %s: %s", content[:40], exc)
+        encoded = base64.b64encode(data).decode("ascii")
+        return {"image_url": f"data:{mime_type};base64,{encoded}"}
 
-        table_summaries = (
-            SUMMARY_PROMPT | llm | parser
-        ).batch([{"element": d.page_content} for d in modal.tables]) if modal.tables else []
+    @staticmethod
+    def _approx_tokens(text: str) -> int:
+        # ~4 characters per token is close enough for throughput trends.
+        return max(1, len(text) // 4)
+
+    def _log_summaries(self, file_path: str, task: SummaryTask, started: float) -> None:
+        elapsed = time.perf_counter() - started
         self.logger.info(
-            "Summaries complete for %s in %.2fs (text=%d, tables=%d)",
+            "Summaries complete for %s in %.2fs (%s=%d, ~%d tokens out, ~%.1f tok/s, "
+            "concurrency=%d)",
             file_path,
-            time.perf_counter() - t_summary,
-            len(text_summaries),
-            len(table_summaries),
+            elapsed,
+            task.modality,
+            len(task.inputs),
+            task.generated_tokens,
+            task.generated_tokens / elapsed if elapsed > 0 else 0.0,
+            self.limiters[task.limiter].limit,
         )
-
-        # Summaries for images (using image_url data URI)
-        image_summaries: List[str] = []
-        if modal.images:
-            t_img = time.perf_counter()
-            image_inputs = [
-                {"image_url": f"data:image/jpeg;base64,{d.page_content}"}
-                for d in modal.images
-            ]
-            image_summaries = (IMAGE_PROMPT | llm | parser).batch(image_inputs)
+        if task.prep_stats is not None and task.prep_stats.images:
+            prep = task.prep_stats.summary()
             self.logger.info(
-                "Image summaries complete for %s in %.2fs (images=%d)",
+                "Image preprocessing for %s: %d/%d re-encoded, %.2fMB -> %.2fMB (%.0f%% saved), "
+                "%.1fMP -> %.1fMP, %.2fs in %d threads; vision calls avg %.2fs, "
+                "~%.1fs saved (estimate, latency proportional to pixels)",
                 file_path,
-                time.perf_counter() - t_img,
-                len(image_summaries),
+                prep["resized"],
+                prep["images"],
+                prep["mb_in"],
+                prep["mb_out"],
+                prep["saved_pct"],
+                prep["mpx_in"],
+                prep["mpx_out"],
+                prep["prep_seconds"],
+                max(1, self.cfg.image_prep_workers),
+                prep["call_seconds"],
+                prep["est_saved_seconds"],
             )
 
-        # Build child docs with doc_ids
-        child_docs: List[Document] = []
-        parents: List[tuple[str, Document]] = []
-
-        def add_docs(chunks: List[Document], summaries: List[str], modality: str) -> None:
-            for idx, d in enumerate(chunks):
-                if idx < len(summaries) and summaries[idx]:
-                    summary = summaries[idx]
-                elif modality == "image":
-                    summary = f"Image from {d.metadata.get('source')} page {d.metadata.get('page_number')}"
-                else:
-                    summary = d.page_content
-                doc_id = f"{modality}-{uuid.uuid4()}"
-                child_docs.append(
-                    Document(
-                        page_content=summary,
-                        metadata={
-                            "doc_id": doc_id,
-                            "modality": modality,
-                            "source": d.metadata.get("source"),
-                            "page_number": d.metadata.get("page_number"),
-                        },
-                    )
-                )
-                parents.append(
-                    (
-                        doc_id,
-                        Document(
-                            page_content=d.page_content,
-                            metadata={
-                                "modality": modality,
-                                "source": d.metadata.get("source"),
-                                "page_number": d.metadata.get("page_number"),
-                            },
-                        ),
-                    )
-                )
+    @staticmethod
+    def _make_documents(
+        modality: str, chunk: Document, summary: Optional[str]
+    ) -> Tuple[Document, Tuple[str, Document]]:
+        """Child (summary) doc for the vector store and its parent doc."""
+        if not summary:
+            if modality == "image":
+                summary = f"Image from {chunk.metadata.get('source')} page {chunk.metadata.get('page_number')}"
+            else:
+                summary = chunk.page_content
+        doc_id = f"{modality}-{uuid.uuid4()}"
+        child = Document(
+            page_content=summary,
+            metadata={
+                "doc_id": doc_id,
+                "modality": modality,
+                "source": chunk.metadata.get("source"),
+                "page_number": chunk.metadata.get("page_number"),
+                "chunk_hash": chunk_hash(modality, chunk.page_content),
+            },
+        )
+        return child, (doc_id, ChatService._parent_document(modality, chunk))
 
-        add_docs(modal.texts, text_summaries, "text")
-        add_docs(modal.tables, table_summaries, "table")
-        add_docs(modal.images, image_summaries, "image")
+    @staticmethod
+    def _parent_document(modality: str, chunk: Document) -> Document:
+        metadata = {
+            "modality": modality,
+            "source": chunk.metadata.get("source"),
+            "page_number": chunk.metadata.get("page_number"),
+        }
+        if modality == "image":
+            # page_content is a blob reference; the type is needed to rebuild a data URI.
+            metadata["mime_type"] = chunk.metadata.get("mime_type") or "image/jpeg"
+            if chunk.metadata.get("pages"):
+                # Near-duplicate figures share this parent; these are all the pages it is on.
+                metadata["pages"] = list(chunk.metadata["pages"])
+        return Document(page_content=chunk.page_content, metadata=metadata)
+
+    def _embed_documents(self, child_docs: List[Document]) -> List[List[float]]:
+        """Embed outside the write lock so retrieval is not blocked meanwhile."""
+        if not child_docs:
+            return []
+        embedder = self.model_service.get_embedder()
+        return self.limiters["embedding"].call(
+            embedder.embed_documents, [d.page_content for d in child_docs]
+        )
+
+    async def _embed_stream(
+        self, inbox: asyncio.Queue, outbox: asyncio.Queue, state: IngestBatch
+    ) -> None:
+        """Embed whatever summaries are ready, up to EMBEDDING_BATCH_SIZE at a time."""
+        size = max(1, self.cfg.embedding_batch_size)
+        finished = False
+        while not finished:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            items = [item]
+            while len(items) < size:
+                try:
+                    item = inbox.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is _DONE:
+                    finished = True
+                    break
+                items.append(item)
+
+            docs = [self._make_documents(*item) for item in items]
+            children = [child for child, _ in docs]
+            started = time.perf_counter()
+            vectors = await asyncio.to_thread(self._embed_documents, children)
+            state.record_embedding(
+                sum(self._approx_tokens(d.page_content) for d in children),
+                started,
+                time.perf_counter(),
+            )
+            await outbox.put((children, [parent for _, parent in docs], vectors))
+
+    async def _stage_stream(self, inbox: asyncio.Queue, state: IngestBatch) -> None:
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            children, parents, vectors = item
+            # Record the parents before writing them so a failed ingest can delete them.
+            state.add(children, parents, vectors)
+            write = asyncio.ensure_future(asyncio.to_thread(self.docstore.mset, parents))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                # Let the thread finish so the rollback runs after this write, not before.
+                await asyncio.wait([write])
+                raise
+
+    def _log_embeddings(self, file_path: str, state: IngestBatch) -> None:
+        elapsed = state.embed_seconds
+        self.logger.info(
+            "Embeddings complete for %s in %.2fs (docs=%d, ~%d tokens in, ~%.1f tok/s, "
+            "concurrency=%d)",
+            file_path,
+            elapsed,
+            len(state.children),
+            state.embed_tokens,
+            state.embed_tokens / elapsed if elapsed > 0 else 0.0,
+            self.limiters["embedding"].limit,
+        )
+
+    def _commit_index(self, state: IngestBatch, file_path: str) -> List[str]:
+        """Add the staged vectors in one write-locked step and persist them.
+
+        Parents are already in the docstore, but nothing is searchable until
+        here, so a failed or cancelled ingest never leaves partial results.
+        """
+        if not (state.children or state.removed_ids or state.kept_parents):
+            return []
+        ids: List[str] = []
+        with self.store_lock.write():
+            if state.children:
+                # Vector ids equal the parent doc_ids so a document can be removed by its ids.
+                ids = self.vector_store.add_embeddings(
+                    list(zip([d.page_content for d in state.children], state.vectors)),
+                    metadatas=[d.metadata for d in state.children],
+                    ids=[d.metadata["doc_id"] for d in state.children],
+                )
+            if state.removed_ids:
+                self.vector_store.delete(state.removed_ids)
+            self._persist_index(ids, state.vectors, state.removed_ids)
+            # The JSON docstore rewrites its file on every call; skip no-op writes.
+            if state.kept_parents:
+                self.docstore.mset(state.kept_parents)
+            if state.removed_ids:
+                state.removed_blobs = self._blob_refs(state.removed_ids)
+                self.docstore.mdelete(state.removed_ids)
+        state.committed = True
+        get_segment_log(self.cfg).maybe_compact_async(
+            self.vector_store, self.store_lock, self.cfg.vector_compact_segments
+        )
         self.logger.info(
-            "Prepared %d child docs for indexing (%d parents)",
-            len(child_docs),
-            len(parents),
+            "Persisted vector store and docstore for %s (indexed %d docs, removed %d)",
+            file_path,
+            len(ids),
+            len(state.removed_ids),
         )
+        return ids
 
-        ids = self.vector_store.add_documents(child_docs) if child_docs else []
-        if child_docs:
+    def _persist_index(
+        self, ids: List[str], vectors: List[List[float]], deleted: List[str]
+    ) -> bool:
+        """Persist an index change; caller holds the write lock. True if the index was rebuilt."""
+        purged = purge_if_needed(self.vector_store, self.cfg)
+        if migrate_if_needed(self.vector_store, self.cfg) or purged:
+            # The index was replaced, so segments cannot be replayed onto the old base.
             persist_vector_store(self.vector_store, self.cfg)
-            self.docstore.mset(parents)
-            self.logger.info(
-                "Persisted vector store and docstore for %s (indexed %d docs)",
-                file_path,
-                len(ids),
+            return True
+        if ids or deleted:
+            persist_vector_store(
+                self.vector_store, self.cfg, ids=ids, vectors=vectors, deleted=deleted
             )
+        return False
 
+    def delete_document(self, source: str) -> Optional[DocumentDeleteResponse]:
+        """Remove every ingested version of ``source``: vectors, parents, registry entries,
+        cached partition output and the uploaded file. Returns None when nothing was
+        ingested under that name."""
+        records = self.registry.by_source(source)
+        if not records:
+            return None
+        ids = list(dict.fromkeys(doc_id for record in records for doc_id in record.chunk_ids))
+        with self.store_lock.write():
+            self.vector_store.delete(ids)
+            rebuilt = self._persist_index([], [], ids)
+            blobs = self._blob_refs(ids)
+            self.docstore.mdelete(ids)
+            self.registry.delete([record.file_hash for record in records])
+            live = getattr(self.vector_store, "live_count", self.vector_store.index.ntotal)
+        self._sweep_blobs(blobs)
+        get_segment_log(self.cfg).maybe_compact_async(
+            self.vector_store, self.store_lock, self.cfg.vector_compact_segments
+        )
+        files = self._remove_uploads(records)
+        partition_cache = getattr(self.file_service, "partition_cache", None)
+        if partition_cache is not None:
+            for record in records:
+                partition_cache.discard(record.file_hash)
+        self.logger.info(
+            "Deleted %s (%d versions, %d chunks, index rebuilt=%s, %d vectors live)",
+            source,
+            len(records),
+            len(ids),
+            rebuilt,
+            live,
+        )
+        return DocumentDeleteResponse(
+            source=source,
+            file_hashes=[record.file_hash for record in records],
+            chunks_removed=len(ids),
+            files_removed=files,
+            index_rebuilt=rebuilt,
+            vectors=live,
+        )
+
+    def _blob_refs(self, doc_ids: List[str]) -> List[str]:
+        """Blob references held by the image parents among ``doc_ids``."""
+        return [
+            doc.page_content
+            for doc in self.docstore.mget(doc_ids)
+            if isinstance(doc, Document)
+            and doc.metadata.get("modality") == "image"
+            and is_blob_ref(doc.page_content)
+        ]
+
+    def _sweep_blobs(self, refs: List[str]) -> None:
+        """Delete blobs no registered document references (deferred while ingests run)."""
+
+        def referenced(candidates: Set[str]) -> Set[str]:
+            by_hash = {chunk_hash("image", ref): ref for ref in candidates}
+            return {by_hash[digest] for digest in self.registry.referenced(by_hash)}
+
+        refs = [ref for ref in refs if is_blob_ref(ref)]
+        removed = self.blob_store.remove_unreferenced(refs, referenced)
+        if removed:
+            self.logger.info("Removed %d unreferenced image blobs", removed)
+
+    def _remove_uploads(self, records: List[DocumentRecord]) -> List[str]:
+        """Delete uploaded copies; files ingested from elsewhere by path are left alone."""
+        upload_dir = self.cfg.upload_dir.resolve()
+        removed: List[str] = []
+        for file_path in dict.fromkeys(record.file_path for record in records):
+            path = Path(file_path).resolve()
+            if upload_dir not in path.parents or not path.exists():
+                continue
+            try:
+                path.unlink()
+                removed.append(str(path))
+            except OSError:
+                self.logger.exception("Failed to remove uploaded file %s", path)
+        return removed
+
+    def _discard_parents(self, state: IngestBatch) -> None:
+        """Drop parents staged by an ingest that failed before its vectors were added."""
+        if state.committed or not state.parent_ids:
+            return
+        try:
+            self.docstore.mdelete(state.parent_ids)
+        except Exception:
+            self.logger.exception("Failed to remove %d staged parents", len(state.parent_ids))
+
+    def _finish_ingest(
+        self,
+        file_path: str,
+        modal: ModalChunks,
+        ids: List[str],
+        started: float,
+        summary_stats: Dict[str, int],
+        file_hash: Optional[str] = None,
+        state: Optional[IngestBatch] = None,
+    ) -> IngestResponse:
         processed_pages = len(
             {
                 d.metadata.get("page_number")
@@ -183,29 +782,230 @@ class ChatService(ChatInterface):
                 if d.metadata.get("page_number") is not None
             }
         )
+        summaries = {
+            "llm": summary_stats["misses"],
+            "cached": summary_stats["hits"],
+            "extractive": summary_stats["extractive"],
+            "raw": summary_stats["raw"],
+            "placeholder": summary_stats["placeholder"],
+        }
         self.logger.info(
-            "Ingest finished for %s in %.2fs (pages=%d, chunks_indexed=%d)",
+            "Ingest finished for %s in %.2fs (pages=%d, chunks_indexed=%d, summary_mode=%s, "
+            "summaries %s)",
             file_path,
-            time.perf_counter() - t_ingest,
+            time.perf_counter() - started,
             processed_pages,
             len(ids),
+            self.summary_policy.mode,
+            " ".join(f"{method}={count}" for method, count in summaries.items()),
         )
 
         return IngestResponse(
             processed_pages=processed_pages,
             chunks_indexed=len(ids),
             vector_store_path=str(self.cfg.vector_store_path),
+            file_hash=file_hash,
+            chunks_reused=len(state.kept_parents) if state else 0,
+            chunks_removed=len(state.removed_ids) if state else 0,
+            summary_mode=self.summary_policy.mode,
+            summaries=summaries,
         )
 
-    def _format_context(self, docs: List[Document]) -> List[ContextChunk]:
-        return [
-            ContextChunk(
-                text=d.page_content,
-                page_number=d.metadata.get("page_number"),
-                source=d.metadata.get("source"),
+    def _register(
+        self,
+        file_path: str,
+        file_hash: str,
+        state: IngestBatch,
+        response: IngestResponse,
+        previous: Optional[DocumentRecord] = None,
+    ) -> None:
+        chunk_hashes: Dict[str, List[str]] = {
+            digest: list(ids) for digest, ids in state.kept_hashes.items()
+        }
+        for child in state.children:
+            chunk_hashes.setdefault(child.metadata["chunk_hash"], []).append(
+                child.metadata["doc_id"]
+            )
+        chunk_ids = [doc_id for ids in chunk_hashes.values() for doc_id in ids]
+        if chunk_ids:
+            self.registry.put(
+                DocumentRecord(
+                    file_hash=file_hash,
+                    source=Path(file_path).name,
+                    file_path=str(Path(file_path).resolve()),
+                    chunk_ids=chunk_ids,
+                    embedding_model=self.cfg.embedding_model,
+                    chat_model=self.cfg.chat_model,
+                    summary_mode=self.summary_policy.mode,
+                    chunking=self._chunking_signature,
+                    chunk_hashes=chunk_hashes,
+                    response=response.model_dump(),
+                )
+            )
+        if previous is not None and (previous.file_hash != file_hash or not chunk_ids):
+            # Its chunks are now either owned by the new record or deleted.
+            self.registry.delete([previous.file_hash])
+
+    def _duplicate_response(
+        self, file_path: str, record: DocumentRecord, started: float
+    ) -> IngestResponse:
+        models = (self.cfg.embedding_model, self.cfg.chat_model, self.summary_policy.mode)
+        if (record.embedding_model, record.chat_model, record.summary_mode) != models:
+            self.logger.warning(
+                "%s was indexed with embedding=%s chat=%s summary_mode=%s; "
+                "current settings differ but the existing chunks are kept",
+                file_path,
+                record.embedding_model,
+                record.chat_model,
+                record.summary_mode,
             )
-            for d in docs
+        self.logger.info(
+            "Skipped duplicate %s in %.3fs (same content as %s, %d chunks)",
+            file_path,
+            time.perf_counter() - started,
+            record.file_path,
+            len(record.chunk_ids),
+        )
+        return IngestResponse(**{**record.response, "duplicate": True})
+
+    def _cache_lookup(
+        self, task: SummaryTask, stats: Dict[str, int]
+    ) -> Tuple[List[str], List[Optional[str]], List[int]]:
+        """Return (cache keys, known summaries, indices still needing the LLM)."""
+        if self.summary_cache is None:
+            stats["misses"] += len(task.inputs)
+            return [], [None] * len(task.inputs), list(range(len(task.inputs)))
+        keys = [
+            SummaryCache.make_key(d.page_content, task.modality, task.model_name, task.prompt_text)
+            for d in task.chunks
         ]
+        summaries: List[Optional[str]] = self.summary_cache.get_many(keys)
+        misses = [idx for idx, summary in enumerate(summaries) if summary is None]
+        stats["hits"] += len(task.inputs) - len(misses)
+        stats["misses"] += len(misses)
+        return keys, summaries, misses
+
+    def _count_generated(self, task: SummaryTask, outputs: List[str]) -> None:
+        task.generated_tokens += sum(self._approx_tokens(o) for o in outputs if o)
+
+    async def _summarise_one(
+        self, task: SummaryTask, inputs: Dict[str, Any], native_async: bool
+    ) -> str:
+        limiter = self.limiters[task.limiter]
+        if native_async:
+            return await limiter.acall(task.chain.ainvoke, inputs)
+        return await asyncio.to_thread(limiter.call, task.chain.invoke, inputs)
+
+    async def _summarise_stream(
+        self,
+        file_path: str,
+        task: SummaryTask,
+        outbox: asyncio.Queue,
+        stats: Dict[str, int],
+        on_done: Callable[[int], None],
+        native_async: bool,
+    ) -> None:
+        """Emit (modality, chunk, summary) per chunk; the LLM sees only cache misses."""
+        t_summary = time.perf_counter()
+        keys, cached, misses = await asyncio.to_thread(self._cache_lookup, task, stats)
+        for idx, summary in enumerate(cached):
+            if summary is not None:
+                await outbox.put((task.modality, task.chunks[idx], summary))
+        on_done(len(task.inputs) - len(misses))
+
+        pending = iter(misses)
+        workers = min(self.limiters[task.limiter].max_concurrency, len(misses))
+        # New summaries are written to the cache in batches, off the event loop.
+        unsaved: List[Tuple[str, str]] = []
+
+        async def save(batch_size: int) -> None:
+            if self.summary_cache is None or len(unsaved) < max(1, batch_size):
+                return
+            batch = unsaved[:]
+            del unsaved[:]
+            await asyncio.to_thread(self.summary_cache.set_many, batch)
+
+        async def summarise(idx: int, inputs: Dict[str, Any]) -> None:
+            started = time.perf_counter()
+            summary = await self._summarise_one(task, inputs, native_async)
+            if task.prep_stats is not None:
+                task.prep_stats.record_call(time.perf_counter() - started)
+            self._count_generated(task, [summary])
+            if summary and self.summary_cache is not None:
+                unsaved.append((keys[idx], summary))
+                await save(_SUMMARY_SAVE_BATCH)
+            await outbox.put((task.modality, task.chunks[idx], summary))
+            on_done(1)
+
+        async def worker() -> None:
+            # Workers share one iterator, so each miss is summarised exactly once.
+            for idx in pending:
+                await summarise(idx, task.inputs[idx])
+
+        if task.prepare is None:
+            try:
+                await asyncio.gather(*(worker() for _ in range(workers)))
+            finally:
+                # Summaries already paid for are kept even when the ingest fails.
+                await save(1)
+            self._log_summaries(file_path, task, t_summary)
+            return
+
+        # Inputs are prepared (e.g. images decoded and downscaled) in threads ahead of
+        # the model calls; the bounded queue keeps only a few encoded payloads in memory.
+        prep_workers = min(max(1, self.cfg.image_prep_workers), len(misses))
+        ready: asyncio.Queue = asyncio.Queue(maxsize=2 * max(prep_workers, workers))
+
+        async def preparer() -> None:
+            for idx in pending:
+                await ready.put((idx, await asyncio.to_thread(task.prepare, task.inputs[idx])))
+
+        async def prepare_all() -> None:
+            try:
+                await asyncio.gather(*(preparer() for _ in range(prep_workers)))
+            finally:
+                for _ in range(workers):
+                    await ready.put(_DONE)
+
+        async def consumer() -> None:
+            while True:
+                item = await ready.get()
+                if item is _DONE:
+                    return
+                await summarise(*item)
+
+        try:
+            await asyncio.gather(prepare_all(), *(consumer() for _ in range(workers)))
+        finally:
+            await save(1)
+        self._log_summaries(file_path, task, t_summary)
+
+    def _format_context(self, docs: List[Document]) -> List[ContextChunk]:
+        chunks: List[ContextChunk] = []
+        for d in docs:
+            text = self._context_text(d)
+            if text is None:
+                continue
+            chunks.append(
+                ContextChunk(
+                    text=text,
+                    page_number=d.metadata.get("page_number"),
+                    source=d.metadata.get("source"),
+                )
+            )
+        return chunks
+
+    def _context_text(self, doc: Document) -> Optional[str]:
+        """Text for API clients: image parents become a data URI, or None if the blob is gone."""
+        if doc.metadata.get("modality") != "image":
+            return doc.page_content
+        content = doc.page_content
+        if is_blob_ref(content):
+            content = self.blob_store.base64(content)
+            if content is None:
+                self.logger.warning("Image blob %s missing; left out of context", doc.page_content)
+                return None
+        return f"data:{doc.metadata.get('mime_type') or 'image/jpeg'};base64,{content}"
 
     @staticmethod
     def _to_text(doc: Any) -> str:
@@ -222,7 +1022,10 @@ class ChatService(ChatInterface):
             content = self._to_text(d).strip()
             if not content:
                 continue
-            # If you're not using images right now, keep everything as text
+            if isinstance(d, Document) and d.metadata.get("modality") == "image":
+                # Blob references (or base64) mean nothing to the text-only answer prompt.
+                images.append(content)
+                continue
             texts.append(content)
         return {"images": images, "texts": texts}
 
@@ -257,14 +1060,51 @@ Answer format:
             )
         ]
 
-    def _generate_answer(self, docs: List[Document], question: str) -> str:
-        """Generate an answer using a retrieval-aware chain."""
-        try:
-            llm: ChatOllama = self.model_service.get_chat_model()
-        except Exception:
-            return " ".join([d.page_content for d in docs])
+    def _stream_chain(self) -> Any:
+        llm: ChatOllama = self.model_service.get_chat_model()
+        return RunnableLambda(self._build_prompt) | llm | StrOutputParser()
+
+    def _stream_payload(self, docs: List[Document], question: str) -> Dict[str, Any]:
+        return {"context": self._parse_docs(docs), "question": question}
+
+    def _search(self, vector: List[float], k: int) -> List[Document]:
+        """Parents of the ``k`` nearest summaries, in rank order (one per doc_id).
+
+        The index search and the docstore lookup share one read lock, so a
+        concurrent delete cannot remove parents between them. The query is
+        embedded by the caller, outside the lock.
+        """
+        with self.store_lock.read():
+            hits = self.vector_store.similarity_search_by_vector(vector, k=k or self.cfg.search_k)
+            doc_ids = list(dict.fromkeys(d.metadata["doc_id"] for d in hits if "doc_id" in d.metadata))
+            parents = self.docstore.mget(doc_ids)
+        return [doc for doc in parents if doc is not None]
+
+    def _retrieve(self, question: str, k: int) -> List[Document]:
+        vector = self.vector_store.embeddings.embed_query(question)
+        docs = self._search(vector, k)
+        self._log_retrieval(docs, question, k)
+        return docs
 
-        chain = (
+    async def _aretrieve(self, question: str, k: int) -> List[Document]:
+        # Embedding and the locked search each take one worker thread and hold
+        # nothing while queued, so waiting writers cannot starve the executor.
+        vector = await asyncio.to_thread(self.vector_store.embeddings.embed_query, question)
+        docs = await asyncio.to_thread(self._search, vector, k)
+        self._log_retrieval(docs, question, k)
+        return docs
+
+    def _log_retrieval(self, docs: List[Document], question: str, k: int) -> None:
+        self.logger.info(
+            "Retrieved %d docs for question (k=%d): %.120s",
+            len(docs),
+            k or self.cfg.search_k,
+            question,
+        )
+
+    def _answer_chain(self, docs: List[Document]) -> Any:
+        llm: ChatOllama = self.model_service.get_chat_model()
+        return (
             {
                 "context": RunnableLambda(lambda _q: docs) | RunnableLambda(self._parse_docs),
                 "question": RunnablePassthrough(),
@@ -274,20 +1114,41 @@ Answer format:
             )
         )
 
+    def _generate_answer(self, docs: List[Document], question: str) -> str:
+        """Generate an answer using a retrieval-aware chain."""
+        try:
+            chain = self._answer_chain(docs)
+        except Exception:
+            return " ".join([d.page_content for d in docs])
+
         result = chain.invoke(question)
         return result["response"]
 
+    async def _agenerate_answer(self, docs: List[Document], question: str) -> str:
+        try:
+            chain = self._answer_chain(docs)
+        except Exception:
+            return " ".join([d.page_content for d in docs])
+
+        result = await chain.ainvoke(question)
+        return result["response"]
+
     def answer(self, question: str, k: int = 4) -> ChatResponse:
         t_answer = time.perf_counter()
-        self.retriever.search_kwargs = {"k": k or self.cfg.search_k}
-        docs: List[Document] = self.retriever.invoke(question)
+        docs = self._retrieve(question, k)
+        answer = self._generate_answer(docs, question)
         self.logger.info(
-            "Retrieved %d docs for question (k=%d): %.120s",
-            len(docs),
-            k or self.cfg.search_k,
+            "Answer generated in %.2fs for question: %.120s",
+            time.perf_counter() - t_answer,
             question,
         )
-        answer = self._generate_answer(docs, question)
+        return ChatResponse(answer=answer, context=self._format_context(docs))
+
+    async def aanswer(self, question: str, k: int = 4) -> ChatResponse:
+        """Async ``answer``: retrieval and generation never block the event loop."""
+        t_answer = time.perf_counter()
+        docs = await self._aretrieve(question, k)
+        answer = await self._agenerate_answer(docs, question)
         self.logger.info(
             "Answer generated in %.2fs for question: %.120s",
             time.perf_counter() - t_answer,
@@ -297,6 +1158,29 @@ Answer format:
 
     def show_context(self, question: str, k: int = 4) -> List[ContextChunk]:
         """Helper to fetch and return the context that would be used for a question."""
-        self.retriever.search_kwargs = {"k": k or self.cfg.search_k}
-        docs: List[Document] = self.retriever.invoke(question)
+        docs = self._retrieve(question, k)
         return self._format_context(docs)
+
+    def stream_answer(self, question: str, k: int = 4) -> Iterator[Tuple[str, Any]]:
+        """Yield ("context", chunks) once, then ("token", text) as the model generates."""
+        docs = self._retrieve(question, k)
+        yield "context", self._format_context(docs)
+        try:
+            chain = self._stream_chain()
+        except Exception:
+            yield "token", " ".join([d.page_content for d in docs])
+            return
+        for token in chain.stream(self._stream_payload(docs, question)):
+            yield "token", token
+
+    async def astream_answer(self, question: str, k: int = 4) -> AsyncIterator[Tuple[str, Any]]:
+        """Async variant of ``stream_answer`` backed by ``ChatOllama.astream``."""
+        docs = await self._aretrieve(question, k)
+        yield "context", self._format_context(docs)
+        try:
+            chain = self._stream_chain()
+        except Exception:
+            yield "token", " ".join([d.page_content for d in docs])
+            return
+        async for token in chain.astream(self._stream_payload(docs, question)):
+            yield "token", token
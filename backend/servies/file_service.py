@@ -1,14 +1,147 @@
 import base64
+import io
 import logging
+import multiprocessing
+import re
 import time
+from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Optional
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from langchain.schema import Document
+from pypdf import PdfReader, PdfWriter
+from unstructured.chunking.dispatch import chunk as chunk_elements
 from unstructured.partition.pdf import partition_pdf
+from unstructured.staging.base import elements_from_dicts, elements_to_dicts
 
 from backend.servies.interface.file_interface import FileInterface
 from backend.servies.types import ModalChunks
+from backend.utils.blob_store import BlobStore, is_blob_ref
+from backend.utils.document_registry import hash_file
+from backend.utils.image_dedup import ImageFilterOptions, NearDuplicateIndex, fingerprint
+from backend.utils.partition_cache import PartitionCache, options_key
+
+
+# Layout/OCR options shared by the serial and page-parallel partition paths.
+PARTITION_KWARGS: Dict[str, Any] = {
+    "strategy": "hi_res",
+    "infer_table_structure": True,
+    "extract_image_block_types": ["Image"],
+    "extract_image_block_to_payload": True,
+    "extract_image_block_output_dir": "figures",
+}
+# Text-layer extraction only (pdfminer): no layout model, OCR or image extraction.
+FAST_PARTITION_KWARGS: Dict[str, Any] = {"strategy": "fast"}
+STRATEGY_KWARGS: Dict[str, Dict[str, Any]] = {
+    "hi_res": PARTITION_KWARGS,
+    "fast": FAST_PARTITION_KWARGS,
+}
+PDF_STRATEGIES = ("auto", "hi_res", "fast")
+
+# Path-drawing operators ("x y l" line segments, "x y w h re" rectangles) on a
+# page; ruled tables and vector charts draw many of them, plain prose few.
+_DRAWING_OPS = re.compile(rb"(?:-?[\d.]+\s+){2}l\b|(?:-?[\d.]+\s+){4}re\b")
+_MAX_FAST_DRAWING_OPS = 24
+
+_MISSING = object()
+# Element category -> modality. TableChunk (a split table) shares the "Table" category.
+_CATEGORY_MODALITY: Dict[str, str] = {
+    "CompositeElement": "text",
+    "Table": "table",
+    "TableChunk": "table",
+    "Image": "image",
+}
+
+
+def _modality(element: object) -> Optional[str]:
+    category = getattr(element, "category", None) or type(element).__name__
+    return _CATEGORY_MODALITY.get(category)
+
+
+def _classify_page(page: Any, min_text_chars: int) -> str:
+    """Why a page needs hi_res ("scanned", "images", "tables"), or "text" if fast is enough."""
+    try:
+        text = page.extract_text() or ""
+    except Exception:
+        return "scanned"
+    if len(text.strip()) < min_text_chars:
+        return "scanned"
+    try:
+        if len(page.images):
+            return "images"
+    except Exception:
+        return "images"
+    try:
+        contents = page.get_contents()
+        data = contents.get_data() if contents is not None else b""
+    except Exception:
+        return "tables"
+    if len(_DRAWING_OPS.findall(data)) > _MAX_FAST_DRAWING_OPS:
+        return "tables"
+    return "text"
+
+
+def _strategy_ranges(
+    strategies: List[str], pages_per_batch: Optional[int] = None
+) -> List[Tuple[int, int, str]]:
+    """Group consecutive 1-based pages sharing a strategy into (first, last, strategy).
+
+    ``pages_per_batch`` caps hi_res ranges only: fast pages are cheap enough
+    that a separate range would cost more in setup than it saves.
+    """
+    ranges: List[Tuple[int, int, str]] = []
+    for page, strategy in enumerate(strategies, start=1):
+        if ranges:
+            first, last, current = ranges[-1]
+            full = (
+                pages_per_batch is not None
+                and strategy == "hi_res"
+                and last - first + 1 >= pages_per_batch
+            )
+            if current == strategy and not full:
+                ranges[-1] = (first, page, strategy)
+                continue
+        ranges.append((page, page, strategy))
+    return ranges
+
+
+# The PDF a process-pool worker opened once in its initializer, for all its ranges.
+_worker_reader: Optional[PdfReader] = None
+
+
+def _open_worker_reader(file_path: str) -> None:
+    global _worker_reader
+    _worker_reader = PdfReader(file_path)
+
+
+def _partition_page_range(
+    file_path: str,
+    first_page: int,
+    last_page: int,
+    strategy: str = "hi_res",
+    reader: Optional[PdfReader] = None,
+) -> list:
+    """Partition pages [first_page, last_page] without chunking (also a process-pool worker).
+
+    The pages are copied into an in-memory sub-PDF; ``reader`` defaults to
+    the worker's reader.
+    """
+    if reader is None:
+        reader = _worker_reader if _worker_reader is not None else PdfReader(file_path)
+    writer = PdfWriter()
+    for idx in range(first_page - 1, last_page):
+        writer.add_page(reader.pages[idx])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    buffer.seek(0)
+    return partition_pdf(
+        file=buffer,
+        metadata_filename=file_path,
+        starting_page_number=first_page,
+        **STRATEGY_KWARGS[strategy],
+    )
 
 
 class PDFFileService(FileInterface):
@@ -22,6 +155,13 @@ class PDFFileService(FileInterface):
         max_characters: int = 2000,
         combine_text_under_n_chars: int = 1500,
         new_after_n_chars: int = 5000,
+        workers: int = 1,
+        pages_per_batch: int = 10,
+        strategy: str = "auto",
+        min_text_chars: int = 100,
+        partition_cache: Optional[PartitionCache] = None,
+        blob_store: Optional[BlobStore] = None,
+        image_filter: Optional[ImageFilterOptions] = None,
     ) -> None:
         if combine_text_under_n_chars > max_characters:
             raise ValueError(
@@ -32,26 +172,147 @@ class PDFFileService(FileInterface):
         self.max_characters = max_characters
         self.combine_text_under_n_chars = combine_text_under_n_chars
         self.new_after_n_chars = new_after_n_chars
+        self.workers = max(1, workers)
+        self.pages_per_batch = max(1, pages_per_batch)
+        if strategy not in PDF_STRATEGIES:
+            raise ValueError(f"Unknown PDF strategy {strategy!r}; expected one of {PDF_STRATEGIES}")
+        self.strategy = strategy
+        self.min_text_chars = min_text_chars
+        self.partition_cache = partition_cache
+        self.blob_store = blob_store
+        self.image_filter = image_filter
+
+    @property
+    def _chunking_kwargs(self) -> Dict[str, Any]:
+        return {
+            "max_characters": self.max_characters,
+            "combine_text_under_n_chars": self.combine_text_under_n_chars,
+            "new_after_n_chars": self.new_after_n_chars,
+        }
+
+    def _page_strategies(self, path: Path, reader: PdfReader) -> List[str]:
+        """Pick fast or hi_res per page; hi_res only where layout/OCR can add something."""
+        if self.strategy != "auto":
+            return [self.strategy] * len(reader.pages)
+        reasons = [_classify_page(page, self.min_text_chars) for page in reader.pages]
+        counts = Counter(reasons)
+        self.logger.info(
+            "Page strategies for %s: fast=%d hi_res=%d (scanned=%d images=%d tables=%d)",
+            path.name,
+            counts["text"],
+            len(reasons) - counts["text"],
+            counts["scanned"],
+            counts["images"],
+            counts["tables"],
+        )
+        return ["fast" if reason == "text" else "hi_res" for reason in reasons]
+
+    @property
+    def _partition_variant(self) -> str:
+        # Everything that changes the raw elements; chunking options deliberately excluded.
+        return options_key(
+            {
+                "strategy": self.strategy,
+                "min_text_chars": self.min_text_chars,
+                "kwargs": STRATEGY_KWARGS,
+            }
+        )
+
+    @property
+    def chunking_signature(self) -> str:
+        """Identifies the chunking options, so a re-tuned file is not taken for a duplicate."""
+        settings: Dict[str, Any] = {"chunking_strategy": self.chunking_strategy, **self._chunking_kwargs}
+        if self.image_filter is not None:
+            # Filtering changes which image chunks exist, so it is part of the signature too.
+            settings["image_filter"] = asdict(self.image_filter)
+        return options_key(settings)
+
+    def _partition_serial(self, path: Path, strategy: str) -> list:
+        return partition_pdf(filename=str(path), **STRATEGY_KWARGS[strategy])
+
+    def _partition_ranges(
+        self, path: Path, ranges: List[Tuple[int, int, str]], reader: PdfReader
+    ) -> list:
+        """Partition page ranges, in worker processes if configured, in page order."""
+        elements: list = []
+        workers = min(self.workers, len(ranges))
+        if workers > 1:
+            # spawn: forking a process that already holds torch/ONNX threads can deadlock.
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=ctx,
+                initializer=_open_worker_reader,
+                initargs=(str(path),),
+            ) as pool:
+                futures = [
+                    pool.submit(_partition_page_range, str(path), first, last, strategy)
+                    for first, last, strategy in ranges
+                ]
+                # Collect in submission order so elements stay in page order.
+                for future in futures:
+                    elements.extend(future.result())
+        else:
+            for first, last, strategy in ranges:
+                elements.extend(_partition_page_range(str(path), first, last, strategy, reader))
+        self.logger.info(
+            "Partitioned %s as %d page ranges across %d workers",
+            path.name,
+            len(ranges),
+            workers,
+        )
+        return elements
+
+    def _partition(self, path: Path) -> list:
+        """Raw (unchunked) elements for the whole file."""
+        # One reader serves strategy detection and every serial range.
+        reader = PdfReader(str(path))
+        strategies = self._page_strategies(path, reader)
+        # Parallel hi_res ranges are capped at pages_per_batch; the rest split on strategy changes.
+        batch = self.pages_per_batch if self.workers > 1 else None
+        ranges = _strategy_ranges(strategies, batch)
+        if len(ranges) <= 1:
+            return self._partition_serial(path, strategies[0] if strategies else "hi_res")
+        return self._partition_ranges(path, ranges, reader)
+
+    def _cached_partition(self, path: Path) -> Tuple[list, bool]:
+        """Raw elements from the partition cache when present, else partition and store them."""
+        if self.partition_cache is None:
+            return self._partition(path), False
+        file_hash = hash_file(path)
+        variant = self._partition_variant
+        cached = self.partition_cache.get(file_hash, variant)
+        if cached is not None:
+            return elements_from_dicts(cached), True
+        elements = self._partition(path)
+        try:
+            self.partition_cache.put(file_hash, variant, elements_to_dicts(elements))
+        except Exception:
+            self.logger.exception("Failed to cache partition output for %s", path.name)
+        return elements, False
+
+    def _chunk(self, elements: list) -> list:
+        return chunk_elements(
+            elements,
+            chunking_strategy=self.chunking_strategy,
+            **self._chunking_kwargs,
+        )
 
     def _custom_chunk(self, elements: Iterable) -> Iterable:
         """Placeholder for future custom chunking (tables/images, etc.)."""
         return elements
 
     @staticmethod
-    def _meta_obj(obj: object) -> object:
-        """Return raw metadata object or dict if present."""
-        return getattr(obj, "metadata", None)
-
-    @classmethod
-    def _meta_value(cls, obj: object, key: str) -> Optional[object]:
-        """Fetch a metadata attribute from metadata obj/dict/to_dict."""
-        meta = cls._meta_obj(obj)
+    def _meta_value(meta: object, key: str) -> Optional[object]:
+        """Read one field from an element's metadata (ElementMetadata, dict or to_dict-able)."""
         if meta is None:
             return None
-        if hasattr(meta, key):
-            return getattr(meta, key)
         if isinstance(meta, dict):
             return meta.get(key)
+        # ElementMetadata answers None for unset known fields, so to_dict is a last resort.
+        value = getattr(meta, key, _MISSING)
+        if value is not _MISSING:
+            return value
         to_dict = getattr(meta, "to_dict", None)
         if callable(to_dict):
             try:
@@ -61,113 +322,129 @@ class PDFFileService(FileInterface):
         return None
 
     @classmethod
-    def _get_page_number(cls, chunk: object) -> Optional[int]:
-        return cls._meta_value(chunk, "page_number")
-
-    @classmethod
-    def _get_orig_elements(cls, chunk: object) -> list:
-        meta = cls._meta_obj(chunk)
-        if meta is None:
-            return []
-        orig = getattr(meta, "orig_elements", None)
-        if orig:
-            return orig
-        if isinstance(meta, dict):
-            return meta.get("orig_elements", []) or []
-        to_dict = getattr(meta, "to_dict", None)
-        if callable(to_dict):
-            try:
-                data = to_dict()
-                return data.get("orig_elements", []) or []
-            except Exception:
-                return []
-        return []
-
-    @classmethod
-    def _iter_chunk_elements(cls, chunk: object) -> list:
-        """Yield orig_elements when present, plus the chunk itself as a fallback."""
-        orig = cls._get_orig_elements(chunk)
-        return (orig or []) + [chunk]
+    def _image_base64(cls, meta: object) -> Optional[str]:
+        img_b64 = cls._meta_value(meta, "image_base64")
+        if img_b64:
+            return img_b64
+        img_path = cls._meta_value(meta, "image_path")
+        if not img_path:
+            return None
+        try:
+            return base64.b64encode(Path(img_path).read_bytes()).decode("utf-8")
+        except Exception:
+            return None
 
-    @classmethod
-    def _page_number_from(cls, *objs: object) -> Optional[int]:
-        for obj in objs:
-            page = cls._get_page_number(obj)
-            if page is not None:
-                return page
-        return None
+    def _image_content(self, meta: object) -> Optional[str]:
+        """Blob reference for the figure when a blob store is configured, else its base64."""
+        if self.blob_store is None:
+            return self._image_base64(meta)
+        img_b64 = self._meta_value(meta, "image_base64")
+        try:
+            if img_b64:
+                data = base64.b64decode(img_b64)
+            else:
+                img_path = self._meta_value(meta, "image_path")
+                if not img_path:
+                    return None
+                data = Path(img_path).read_bytes()
+        except Exception:
+            return None
+        return self.blob_store.put(data)
 
-    def _extract_tables(self, elements: Iterable, source: str) -> List[Document]:
-        """Match notebook get_table: iterate orig_elements and grab table HTML."""
-        tables: List[Document] = []
-        for chunk in elements:
-            orig_elements = self._get_orig_elements(chunk)
-            for el in orig_elements:
-                if "Table" in str(type(el)):
-                    html = self._meta_value(el, "text_as_html") or getattr(el, "text", "")
-                    if not html:
-                        continue
-                    tables.append(
-                        Document(
-                            page_content=str(html),
-                            metadata={
-                                "source": source,
-                                "page_number": self._page_number_from(el, chunk),
-                                "type": "table",
-                            },
-                        )
-                    )
-        return tables
+    def _extract_modal(self, chunks: Iterable, source: str) -> ModalChunks:
+        """Split chunks into text, table and image documents in one pass.
 
-    def _extract_texts(self, elements: Iterable, source: str) -> List[Document]:
-        """Match notebook save_texts: keep CompositeElement chunks as text docs."""
+        CompositeElement chunks become text documents; tables (HTML when
+        inferred) and images (payload, or the file on disk) come from each
+        chunk's ``orig_elements``, as in the notebook's get_table and
+        get_image_base64. Images are written to the blob store and referenced.
+        """
         texts: List[Document] = []
-        for chunk in elements:
-            if "CompositeElement" in str(type(chunk)):
-                text = getattr(chunk, "text", "") or ""
-                cleaned = text.strip()
-                if cleaned:
+        tables: List[Document] = []
+        images: List[Document] = []
+        meta_value = self._meta_value
+        for chunk in chunks:
+            chunk_meta = getattr(chunk, "metadata", None)
+            chunk_page = meta_value(chunk_meta, "page_number")
+            if _modality(chunk) == "text":
+                text = (getattr(chunk, "text", "") or "").strip()
+                if text:
                     texts.append(
                         Document(
-                            page_content=cleaned,
-                            metadata={
-                                "source": source,
-                                "page_number": self._page_number_from(chunk),
-                                "type": "text",
-                            },
+                            page_content=text,
+                            metadata={"source": source, "page_number": chunk_page, "type": "text"},
                         )
                     )
-        return texts
-
-    def _extract_images(self, elements: Iterable, source: str) -> List[Document]:
-        """Match notebook get_image_base64: pull base64 from orig_elements or disk."""
-        images: List[Document] = []
-        for chunk in elements:
-            orig_elements = self._get_orig_elements(chunk)
-            for el in orig_elements:
-                if "Image" not in str(type(el)):
+            for el in meta_value(chunk_meta, "orig_elements") or ():
+                modality = _modality(el)
+                if modality not in ("table", "image"):
                     continue
-                img_b64 = self._meta_value(el, "image_base64")
-                if not img_b64:
-                    img_path = self._meta_value(el, "image_path")
-                    if img_path:
-                        try:
-                            data = Path(img_path).read_bytes()
-                            img_b64 = base64.b64encode(data).decode("utf-8")
-                        except Exception:
-                            img_b64 = None
-                if img_b64:
-                    images.append(
-                        Document(
-                            page_content=img_b64,
-                            metadata={
-                                "source": source,
-                                "page_number": self._page_number_from(el, chunk),
-                                "type": "image",
-                            },
-                        )
-                    )
-        return images
+                meta = getattr(el, "metadata", None)
+                page = meta_value(meta, "page_number")
+                metadata = {
+                    "source": source,
+                    "page_number": chunk_page if page is None else page,
+                    "type": modality,
+                }
+                if modality == "table":
+                    content = meta_value(meta, "text_as_html") or getattr(el, "text", "")
+                    target = tables
+                else:
+                    content = self._image_content(meta)
+                    metadata["mime_type"] = meta_value(meta, "image_mime_type") or "image/jpeg"
+                    target = images
+                if content:
+                    target.append(Document(page_content=str(content), metadata=metadata))
+        return ModalChunks(texts=texts, tables=tables, images=images)
+
+    def _image_bytes(self, content: str) -> Optional[bytes]:
+        if is_blob_ref(content):
+            return self.blob_store.get(content) if self.blob_store is not None else None
+        try:
+            return base64.b64decode(content)
+        except ValueError:
+            return None
+
+    def _filter_images(self, images: List[Document]) -> Tuple[List[Document], Dict[str, int]]:
+        """Drop decorative figures and fold near-duplicates into their first occurrence.
+
+        A folded figure is neither summarised nor indexed; its representative
+        lists every page it appears on under ``pages``. Figures that cannot be
+        decoded are kept as they are.
+        """
+        stats = {"decorative": 0, "duplicates": 0}
+        opts = self.image_filter
+        if opts is None or not images:
+            return images, stats
+        kept: List[Document] = []
+        index = NearDuplicateIndex(opts.max_distance)
+        # Same bytes give the same blob reference; decode each distinct figure once.
+        seen: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        for doc in images:
+            content = doc.page_content
+            if content not in seen:
+                data = self._image_bytes(content)
+                seen[content] = fingerprint(data) if data is not None else None
+            info = seen[content]
+            if info is None:
+                kept.append(doc)
+                continue
+            width, height, image_hash = info
+            if opts.is_decorative(width, height):
+                stats["decorative"] += 1
+                continue
+            match = index.find(image_hash) if opts.dedup else None
+            if match is None:
+                index.add(image_hash, len(kept))
+                kept.append(doc)
+                continue
+            stats["duplicates"] += 1
+            rep_meta = kept[match].metadata
+            pages = rep_meta.setdefault("pages", [rep_meta.get("page_number")])
+            page = doc.metadata.get("page_number")
+            if page not in pages:
+                pages.append(page)
+        return kept, stats
 
     def load(self, file_path: str) -> ModalChunks:
         path = Path(file_path)
@@ -176,44 +453,57 @@ class PDFFileService(FileInterface):
 
         start = time.perf_counter()
         self.logger.info(
-            "Parsing PDF %s with chunking=%s max_chars=%d combine_under=%d new_after=%d",
+            "Parsing PDF %s with chunking=%s max_chars=%d combine_under=%d new_after=%d workers=%d",
             path.name,
             self.chunking_strategy,
             self.max_characters,
             self.combine_text_under_n_chars,
             self.new_after_n_chars,
+            self.workers,
         )
 
-        elements = partition_pdf(
-            filename=str(path),
-            strategy="hi_res",
-            infer_table_structure=True,
-            extract_image_block_types=["Image"],
-            extract_image_block_to_payload=True,
-            extract_image_block_output_dir="figures",
-            chunking_strategy=self.chunking_strategy,
-            max_characters=self.max_characters,
-            combine_text_under_n_chars=self.combine_text_under_n_chars,
-            new_after_n_chars=self.new_after_n_chars,
-        )
+        elements, cached = self._cached_partition(path)
+        partitioned = time.perf_counter()
         self.logger.info(
-            "Partitioned %s into %d elements in %.2fs",
+            "Partitioned %s into %d elements in %.2fs%s",
             path.name,
             len(elements),
-            time.perf_counter() - start,
+            partitioned - start,
+            " (from partition cache)" if cached else "",
         )
 
-        chunked = self._custom_chunk(elements)
+        chunks = self._chunk(elements)
+        self.logger.info(
+            "Chunked %s into %d chunks in %.2fs",
+            path.name,
+            len(chunks),
+            time.perf_counter() - partitioned,
+        )
+        chunked = self._custom_chunk(chunks)
 
-        texts = self._extract_texts(chunked, str(path.name))
-        tables = self._extract_tables(chunked, str(path.name))
-        images = self._extract_images(chunked, str(path.name))
+        modal = self._extract_modal(chunked, str(path.name))
+        extracted = modal.images
+        modal.images, image_stats = self._filter_images(extracted)
+        if len(modal.images) < len(extracted):
+            # Blobs stored for dropped figures; swept unless another document uses them.
+            kept = {d.page_content for d in modal.images}
+            modal.discarded = sorted(
+                {d.page_content for d in extracted if is_blob_ref(d.page_content)} - kept
+            )
+        if modal.images and len(modal.images) < len(extracted):
+            self.logger.info(
+                "Kept %d of %d images from %s (%d near-duplicates, %d decorative)",
+                len(modal.images),
+                len(extracted),
+                path.name,
+                image_stats["duplicates"],
+                image_stats["decorative"],
+            )
         self.logger.info(
             "Extracted %d text chunks, %d tables, %d images from %s",
-            len(texts),
-            len(tables),
-            len(images),
+            len(modal.texts),
+            len(modal.tables),
+            len(modal.images),
             path.name,
         )
-
-        return ModalChunks(texts=texts, tables=tables, images=images)
+        return modal
@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from backend.models.schemas import IngestJobStatus, IngestResponse
+from backend.servies.interface.chat_interface import ChatInterface
+
+
+class IngestCancelled(Exception):
+    """Raised from the progress callback once a running job is cancelled."""
+
+
+class IngestQueueFull(Exception):
+    """Raised when the bounded ingest queue cannot take another job."""
+
+
+@dataclass
+class IngestJob:
+    """State of one background ingest, updated from the worker thread."""
+
+    job_id: str
+    file_path: str
+    status: str = "queued"  # queued | running | completed | failed | cancelled
+    stage: str = "queued"
+    summarised: int = 0
+    summary_total: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+    result: Optional[IngestResponse] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    _stage_started: float = field(default_factory=time.perf_counter)
+    _cancel: threading.Event = field(default_factory=threading.Event)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def progress(self, stage: str, done: Optional[int] = None, total: Optional[int] = None) -> None:
+        """ChatService progress callback; doubles as the cancellation checkpoint."""
+        # Once persisted the work is committed, so a late cancel no longer applies.
+        if stage != "persisted" and self._cancel.is_set():
+            raise IngestCancelled(self.job_id)
+        with self._lock:
+            now = time.perf_counter()
+            if stage != self.stage:
+                self.timings[self.stage] = round(now - self._stage_started, 3)
+                self._stage_started = now
+                self.stage = stage
+            if stage == "summarised":
+                self.summarised = done or 0
+                self.summary_total = total or 0
+
+    def _finish(self, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.timings[self.stage] = round(time.perf_counter() - self._stage_started, 3)
+            self.timings["total"] = round(time.time() - self.submitted_at, 3)
+            self.status = status
+            self.error = error
+
+    def snapshot(self) -> IngestJobStatus:
+        with self._lock:
+            return IngestJobStatus(
+                job_id=self.job_id,
+                file_path=self.file_path,
+                status=self.status,
+                stage=self.stage,
+                summarised=self.summarised,
+                summary_total=self.summary_total,
+                timings=dict(self.timings),
+                result=self.result,
+                error=self.error,
+            )
+
+
+class IngestJobManager:
+    """In-process worker pool running ingests as jobs with a bounded queue."""
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 8, keep_finished: int = 100) -> None:
+        self.max_queue = max(1, max_queue)
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="ingest"
+        )
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, service: ChatInterface, file_path: str) -> IngestJob:
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if not job.finished)
+            if active >= self.max_queue:
+                raise IngestQueueFull(f"Ingest queue is full ({active} jobs pending)")
+            job = IngestJob(job_id=uuid.uuid4().hex, file_path=file_path)
+            self._jobs[job.job_id] = job
+            self._prune()
+        job._future = self._executor.submit(self._run, service, job)
+        self.logger.info("Queued ingest job %s for %s", job.job_id, file_path)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[IngestJob]:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job._cancel.set()
+        # A job still waiting in the pool never starts; running jobs stop at the next stage.
+        if job._future is not None and job._future.cancel():
+            job._finish("cancelled")
+        return job
+
+    def shutdown(self) -> None:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if not job.finished:
+                self.cancel(job.job_id)
+        self._executor.shutdown(wait=False)
+
+    def _run(self, service: ChatInterface, job: IngestJob) -> None:
+        if job._cancel.is_set():
+            job._finish("cancelled")
+            return
+        with job._lock:
+            job.status = "running"
+        try:
+            job.result = service.ingest(job.file_path, progress=job.progress)
+        except IngestCancelled:
+            self.logger.info("Ingest job %s cancelled during %s", job.job_id, job.stage)
+            job._finish("cancelled")
+        except Exception as exc:
+            self.logger.exception("Ingest job %s failed", job.job_id)
+            job._finish("failed", str(exc))
+        else:
+            job._finish("completed")
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
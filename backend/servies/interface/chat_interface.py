@@ -1,13 +1,24 @@
-from typing import Protocol
+from typing import Optional, Protocol
 
 from langchain_core.documents import Document
 
-from backend.models.schemas import ChatResponse
+from backend.models.schemas import ChatResponse, IngestResponse
+from backend.servies.types import ProgressCallback
 
 
 class ChatInterface(Protocol):
-    def ingest(self, file_path: str) -> int:
-        """Process and index a file, returning the number of chunks."""
+    def ingest(
+        self, file_path: str, progress: Optional[ProgressCallback] = None
+    ) -> IngestResponse:
+        """Process and index a file, reporting stage progress if a callback is given."""
 
     def answer(self, question: str, k: int = 4) -> ChatResponse:
         """Run retrieval over the persisted vector store."""
+
+    async def aingest(
+        self, file_path: str, progress: Optional[ProgressCallback] = None
+    ) -> IngestResponse:
+        """Async variant of ``ingest`` that does not block the event loop."""
+
+    async def aanswer(self, question: str, k: int = 4) -> ChatResponse:
+        """Async variant of ``answer`` that does not block the event loop."""
@@ -1,13 +1,14 @@
 from typing import Protocol
 
-from langchain_ollama import ChatOllama, OllamaEmbeddings
+from langchain_core.embeddings import Embeddings
+from langchain_ollama import ChatOllama
 
 
 class ModelInterface(Protocol):
     """Abstraction for model lifecycle and generation."""
 
-    def get_embedder(self) -> OllamaEmbeddings:
-        """Return (and cache) an embedding model."""
+    def get_embedder(self) -> Embeddings:
+        """Return (and cache) an embedding model, wrapped in the embedding cache if enabled."""
 
     def get_chat_model(self) -> ChatOllama:
         """Return (and cache) a chat model for answering questions."""
@@ -1,10 +1,12 @@
 from functools import lru_cache
-from typing import Optional
+from typing import Dict, Optional
 
+from langchain_core.embeddings import Embeddings
 from langchain_ollama import ChatOllama, OllamaEmbeddings
 
 from backend.core.config import Settings
 from backend.servies.interface.model_interface import ModelInterface
+from backend.utils.embedding_cache import CachedEmbeddings, EmbeddingStore
 
 
 class ModelService(ModelInterface):
@@ -12,17 +14,39 @@ class ModelService(ModelInterface):
 
     def __init__(self, cfg: Settings) -> None:
         self.cfg = cfg
-        self._embedder: Optional[OllamaEmbeddings] = None
+        self._raw_embedder: Optional[OllamaEmbeddings] = None
+        self._embedder: Optional[Embeddings] = None
         self._chat: Optional[ChatOllama] = None
 
-    def get_embedder(self) -> OllamaEmbeddings:
-        if self._embedder is None:
-            self._embedder = OllamaEmbeddings(
+    def get_raw_embedder(self) -> OllamaEmbeddings:
+        """Uncached Ollama embeddings, e.g. for readiness checks."""
+        if self._raw_embedder is None:
+            self._raw_embedder = OllamaEmbeddings(
                 model=self.cfg.embedding_model,
                 base_url=self.cfg.ollama_base_url,
             )
+        return self._raw_embedder
+
+    def get_embedder(self) -> Embeddings:
+        if self._embedder is None:
+            raw = self.get_raw_embedder()
+            if self.cfg.embedding_cache_enabled:
+                self._embedder = CachedEmbeddings(
+                    raw,
+                    model=self.cfg.embedding_model,
+                    store=EmbeddingStore(self.cfg.embedding_cache_path),
+                    query_cache_size=self.cfg.embedding_query_cache_size,
+                )
+            else:
+                self._embedder = raw
         return self._embedder
 
+    def embedding_cache_stats(self) -> Optional[Dict[str, int]]:
+        embedder = self.get_embedder()
+        if isinstance(embedder, CachedEmbeddings):
+            return embedder.stats()
+        return None
+
     def get_chat_model(self) -> ChatOllama:
         if self._chat is None:
             # Derive chat model name if using an embedding model naming convention.
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from typing import FrozenSet
+
+from backend.core.config import Settings
+
+SUMMARY_MODES = ("llm", "extractive", "raw")
+MODALITIES = ("text", "table", "image")
+
+
+@dataclass(frozen=True)
+class SummaryPolicy:
+    """Decides per chunk how the text indexed for it is produced.
+
+    Methods: ``llm`` (chat model summary), ``extractive`` (top sentences,
+    text only), ``raw`` (the chunk itself) and ``placeholder`` (images not
+    sent to the vision model get a "Image from <source> page <n>" stub).
+    """
+
+    mode: str = "llm"
+    modalities: FrozenSet[str] = frozenset(MODALITIES)
+    min_chars: int = 0
+    extractive_sentences: int = 3
+
+    @classmethod
+    def from_settings(cls, cfg: Settings) -> "SummaryPolicy":
+        if cfg.summary_mode not in SUMMARY_MODES:
+            raise ValueError(
+                f"Unknown SUMMARY_MODE {cfg.summary_mode!r}; expected one of {SUMMARY_MODES}"
+            )
+        unknown = set(cfg.summary_modalities) - set(MODALITIES)
+        if unknown:
+            raise ValueError(f"Unknown SUMMARY_MODALITIES {sorted(unknown)}")
+        return cls(
+            mode=cfg.summary_mode,
+            modalities=frozenset(cfg.summary_modalities),
+            min_chars=cfg.summary_min_chars,
+            extractive_sentences=cfg.summary_extractive_sentences,
+        )
+
+    def method(self, modality: str, content: str) -> str:
+        if modality == "image":
+            # Images have no text to fall back on; only the vision model can describe them.
+            return "llm" if "image" in self.modalities else "placeholder"
+        if self.mode == "raw" or modality not in self.modalities:
+            return "raw"
+        if len(content) < self.min_chars:
+            return "raw"
+        if self.mode == "extractive" and modality == "text":
+            return "extractive"
+        # Table HTML has no sentences to extract, so tables stay with the LLM.
+        return "llm"
@@ -1,11 +1,79 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from langchain.schema import Document
 
+from backend.utils.image_prep import ImagePrepStats
+
+# progress(stage, done, total): stages are partitioned, summarised, embedded, persisted.
+ProgressCallback = Callable[[str, Optional[int], Optional[int]], None]
+
 
 @dataclass
 class ModalChunks:
     texts: List[Document]
     tables: List[Document]  # tables stored as HTML in page_content
-    images: List[Document]  # images stored as base64 in page_content
+    # "blob:sha256:<hash>" references into the blob store (base64 without one)
+    images: List[Document]
+    # Blob references of figures dropped at extraction (decorative or near-duplicates).
+    discarded: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SummaryTask:
+    """One modality's worth of chunks to summarise with a given chain."""
+
+    modality: str
+    chain: Any  # Runnable: prompt | llm | parser
+    inputs: List[Dict[str, Any]]
+    chunks: List[Document]
+    model_name: str
+    prompt_text: str
+    limiter: str = "summary"  # key into the per-stage concurrency limiters
+    # Builds the chain input from inputs[i] right before the call (e.g. blob -> data URI).
+    prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    prep_stats: Optional[ImagePrepStats] = None  # set when prepare downscales images
+    generated_tokens: int = 0  # approximate, for throughput logging
+
+
+@dataclass
+class IngestBatch:
+    """Changes staged by the ingest pipeline, waiting to be applied to the index."""
+
+    children: List[Document] = field(default_factory=list)
+    vectors: List[List[float]] = field(default_factory=list)
+    parent_ids: List[str] = field(default_factory=list)
+    # Re-ingest of a revised file: unchanged chunks keep their ids, vanished ones go.
+    kept_parents: List[Tuple[str, Document]] = field(default_factory=list)
+    kept_hashes: Dict[str, List[str]] = field(default_factory=dict)
+    removed_ids: List[str] = field(default_factory=list)
+    # Blob references of removed image parents, checked for other users after the ingest.
+    removed_blobs: List[str] = field(default_factory=list)
+    committed: bool = False
+    embed_tokens: int = 0
+    embed_started: Optional[float] = None
+    embed_finished: Optional[float] = None
+
+    @property
+    def embed_seconds(self) -> float:
+        """Wall time from the first embedding call starting to the last one ending."""
+        if self.embed_started is None or self.embed_finished is None:
+            return 0.0
+        return self.embed_finished - self.embed_started
+
+    def add(
+        self,
+        children: List[Document],
+        parents: List[Tuple[str, Document]],
+        vectors: List[List[float]],
+    ) -> None:
+        self.children.extend(children)
+        self.vectors.extend(vectors)
+        self.parent_ids.extend(doc_id for doc_id, _ in parents)
+
+    def record_embedding(self, tokens: int, started: float, finished: float) -> None:
+        self.embed_tokens += tokens
+        if self.embed_started is None or started < self.embed_started:
+            self.embed_started = started
+        if self.embed_finished is None or finished > self.embed_finished:
+            self.embed_finished = finished
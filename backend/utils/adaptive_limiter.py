@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+# Transient transport failures; the Ollama client raises httpx errors.
+_TRANSIENT_ERRORS = (ConnectionError, TimeoutError, asyncio.TimeoutError, httpx.TransportError)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Retry connection failures, timeouts, 429 and 5xx; anything else is a real error."""
+    if isinstance(exc, _TRANSIENT_ERRORS):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        # httpx.HTTPStatusError carries the status on its response.
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class AdaptiveLimiter:
+    """Caps in-flight calls to one Ollama stage and adapts the cap (AIMD).
+
+    Each success nudges the limit up by ``1/limit`` (about +1 per full
+    window); a failure or a call slower than ``latency_factor`` times the
+    running baseline halves it, at most once per window. The limit never
+    leaves ``[1, max_concurrency]``. Shared by all ingests in the process,
+    so concurrent jobs do not multiply the load on the server.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_retries: int = 2,
+        latency_factor: float = 3.0,
+        backoff_seconds: float = 0.5,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.latency_factor = latency_factor
+        self.backoff_seconds = backoff_seconds
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._baseline: Optional[float] = None
+        self._since_decrease = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._limit))
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    async def _aacquire(self) -> None:
+        acquire = asyncio.ensure_future(asyncio.to_thread(self.acquire))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # The thread still takes the slot; hand it back once it does.
+            acquire.add_done_callback(lambda fut: fut.exception() is None and self.release())
+            raise
+
+    def _record(self, seconds: float, failed: bool) -> None:
+        with self._cond:
+            self._since_decrease += 1
+            spike = (
+                not failed
+                and self._baseline is not None
+                and seconds > self.latency_factor * self._baseline
+            )
+            if (failed or spike) and self._since_decrease >= self.limit:
+                self._limit = max(1.0, self._limit / 2)
+                self._since_decrease = 0
+                logger.warning(
+                    "Backing off %s concurrency to %d (%s)",
+                    self.name,
+                    self.limit,
+                    "error" if failed else f"latency {seconds:.1f}s",
+                )
+            elif not failed and not spike:
+                self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+            if not failed:
+                # Slow EWMA so a single spike does not become the new normal.
+                self._baseline = (
+                    seconds if self._baseline is None else 0.9 * self._baseline + 0.1 * seconds
+                )
+            self._cond.notify_all()
+
+    def call(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` inside the limit, retrying retryable failures."""
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            started = time.perf_counter()
+            try:
+                result = fn(*args)
+            except Exception as exc:
+                if not is_retryable(exc):
+                    # Bad input or a bug, not server load: leave the limit alone.
+                    raise
+                self._record(time.perf_counter() - started, failed=True)
+                if attempt == self.max_retries:
+                    raise
+            else:
+                self._record(time.perf_counter() - started, failed=False)
+                return result
+            finally:
+                self.release()
+            time.sleep(self.backoff_seconds * 2**attempt)
+        raise AssertionError("unreachable")
+
+    async def acall(self, fn: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """Async ``call``; waiting for a slot happens in a thread, not on the loop."""
+        for attempt in range(self.max_retries + 1):
+            await self._aacquire()
+            started = time.perf_counter()
+            try:
+                result = await fn(*args)
+            except Exception as exc:
+                if not is_retryable(exc):
+                    # Bad input or a bug, not server load: leave the limit alone.
+                    raise
+                self._record(time.perf_counter() - started, failed=True)
+                if attempt == self.max_retries:
+                    raise
+            else:
+                self._record(time.perf_counter() - started, failed=False)
+                return result
+            finally:
+                self.release()
+            await asyncio.sleep(self.backoff_seconds * 2**attempt)
+        raise AssertionError("unreachable")
+
+
+def build_limiters(
+    summary: int, image: int, embedding: int, max_retries: int, latency_factor: float
+) -> Dict[str, AdaptiveLimiter]:
+    return {
+        name: AdaptiveLimiter(name, limit, max_retries=max_retries, latency_factor=latency_factor)
+        for name, limit in (("summary", summary), ("image", image), ("embedding", embedding))
+    }
@@ -0,0 +1,152 @@
+"""Micro-benchmark for PDFFileService modal extraction over synthetic chunks.
+
+Compares the single-pass, category-dispatched extractor with the previous
+three passes that matched ``str(type(el))`` substrings:
+
+    python -m backend.utils.benchmark_extract --chunks 20000 --repeat 5
+"""
+
+import random
+import time
+from typing import Callable, List, Tuple
+
+from langchain.schema import Document
+from unstructured.documents.elements import (
+    CompositeElement,
+    ElementMetadata,
+    Image,
+    NarrativeText,
+    Table,
+    Title,
+)
+
+from backend.servies.file_service import PDFFileService
+from backend.servies.types import ModalChunks
+
+
+def synthetic_chunks(n: int, seed: int) -> Tuple[list, int]:
+    """Chunks shaped like chunk_elements output: composites wrapping text/images, and tables.
+
+    Returns the chunks and the total element count (chunks plus orig_elements).
+    """
+    rng = random.Random(seed)
+    chunks: list = []
+    elements = 0
+    for i in range(n):
+        page = i // 4 + 1
+        if rng.random() < 0.15:
+            table = Table(
+                text=f"col a col b {i}",
+                metadata=ElementMetadata(page_number=page, text_as_html=f"<table>{i}</table>"),
+            )
+            orig = [table]
+            chunk = Table(text=table.text, metadata=ElementMetadata(page_number=page))
+        else:
+            orig = [Title(text=f"Section {i}", metadata=ElementMetadata(page_number=page))]
+            orig += [
+                NarrativeText(
+                    text=f"Sentence {i}.{j} " * 8, metadata=ElementMetadata(page_number=page)
+                )
+                for j in range(rng.randint(2, 6))
+            ]
+            if rng.random() < 0.1:
+                image_meta = ElementMetadata(page_number=page, image_base64="iVBORw0KGgo=")
+                orig.append(Image(text="", metadata=image_meta))
+            chunk = CompositeElement(
+                text=" ".join(el.text for el in orig), metadata=ElementMetadata(page_number=page)
+            )
+        chunk.metadata.orig_elements = orig
+        chunks.append(chunk)
+        elements += 1 + len(orig)
+    return chunks, elements
+
+
+def legacy_extract(chunks: list, source: str) -> ModalChunks:
+    """The previous extractors: one pass per modality, str(type()) checks, to_dict fallbacks."""
+
+    def meta_value(obj: object, key: str) -> object:
+        meta = getattr(obj, "metadata", None)
+        if meta is None:
+            return None
+        if hasattr(meta, key):
+            return getattr(meta, key)
+        if isinstance(meta, dict):
+            return meta.get(key)
+        to_dict = getattr(meta, "to_dict", None)
+        return to_dict().get(key) if callable(to_dict) else None
+
+    def orig_elements(chunk: object) -> list:
+        return meta_value(chunk, "orig_elements") or []
+
+    def page(*objs: object) -> object:
+        for obj in objs:
+            value = meta_value(obj, "page_number")
+            if value is not None:
+                return value
+        return None
+
+    def doc(content: object, page_number: object, modality: str) -> Document:
+        return Document(
+            page_content=str(content),
+            metadata={"source": source, "page_number": page_number, "type": modality},
+        )
+
+    texts = [
+        doc(chunk.text.strip(), page(chunk), "text")
+        for chunk in chunks
+        if "CompositeElement" in str(type(chunk)) and (chunk.text or "").strip()
+    ]
+    tables = [
+        doc(meta_value(el, "text_as_html") or el.text, page(el, chunk), "table")
+        for chunk in chunks
+        for el in orig_elements(chunk)
+        if "Table" in str(type(el))
+    ]
+    images = [
+        doc(meta_value(el, "image_base64"), page(el, chunk), "image")
+        for chunk in chunks
+        for el in orig_elements(chunk)
+        if "Image" in str(type(el)) and meta_value(el, "image_base64")
+    ]
+    return ModalChunks(texts=texts, tables=tables, images=images)
+
+
+def time_per_element(
+    fn: Callable[[], ModalChunks], elements: int, repeat: int
+) -> Tuple[float, ModalChunks]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e6 / elements, result
+
+
+def run(n: int, repeat: int, seed: int) -> None:
+    chunks, elements = synthetic_chunks(n, seed)
+    service = PDFFileService()
+    rows: List[Tuple[str, Callable[[], ModalChunks]]] = [
+        ("three-pass str(type) (legacy)", lambda: legacy_extract(chunks, "bench.pdf")),
+        ("single-pass category dispatch", lambda: service._extract_modal(chunks, "bench.pdf")),
+    ]
+    print(f"chunks={n} elements={elements} repeat={repeat} (best run)")
+    print(f"{'extractor':<32}{'us/element':>12}{'texts':>8}{'tables':>8}{'images':>8}")
+    for label, fn in rows:
+        cost, modal = time_per_element(fn, elements, repeat)
+        print(
+            f"{label:<32}{cost:>12.3f}"
+            f"{len(modal.texts):>8}{len(modal.tables):>8}{len(modal.images):>8}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark modal extraction on synthetic chunks.")
+    parser.add_argument("--chunks", type=int, default=20_000, help="Number of synthetic chunks")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per extractor (best kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.chunks, args.repeat, args.seed)
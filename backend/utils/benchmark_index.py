@@ -0,0 +1,101 @@
+"""Recall/latency benchmark for the configurable FAISS index types.
+
+Uses synthetic clustered, L2-normalised vectors so it runs without Ollama:
+
+    python -m backend.utils.benchmark_index --n 200000 --dim 768 --types flat,hnsw,ivf
+"""
+
+import time
+from typing import List
+
+import faiss
+import numpy as np
+
+from backend.core.config import Settings
+from backend.utils.faiss_index import INDEX_TYPES, QUANTIZED_TYPES, create_index, factory_string
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=n)
+    data = centers[labels] + 0.3 * rng.standard_normal((n, dim)).astype(np.float32)
+    faiss.normalize_L2(data)
+    return data
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def rerank(data: np.ndarray, query: np.ndarray, candidates: np.ndarray, k: int) -> np.ndarray:
+    """Exact re-scoring of approximate candidates, as RerankingFAISS does."""
+    out = np.empty((len(query), k), dtype=np.int64)
+    for row, (q, cand) in enumerate(zip(query, candidates)):
+        cand = cand[cand != -1]
+        order = np.argsort(-(data[cand] @ q))[:k]
+        out[row, : len(order)] = cand[order]
+        out[row, len(order) :] = -1
+    return out
+
+
+def run(cfg: Settings, kinds: List[str], n: int, dim: int, queries: int, k: int, seed: int) -> None:
+    data = synthetic_vectors(n, dim, clusters=max(8, n // 1000), seed=seed)
+    query = synthetic_vectors(queries, dim, clusters=max(8, n // 1000), seed=seed + 1)
+
+    exact = faiss.IndexFlatIP(dim)
+    exact.add(data)
+    _, truth = exact.search(query, k)
+
+    print(f"n={n} dim={dim} queries={queries} k={k}")
+    print(f"{'index':<28}{'build s':>10}{'recall@k':>10}{'ms/query':>10}{'MB':>10}")
+    for kind in kinds:
+        t_build = time.perf_counter()
+        index = create_index(kind, dim, cfg, train_vectors=data)
+        index.add(data)
+        build_s = time.perf_counter() - t_build
+
+        t_search = time.perf_counter()
+        _, found = index.search(query, k)
+        ms_per_query = (time.perf_counter() - t_search) * 1000 / queries
+
+        size_mb = faiss.serialize_index(index).nbytes / 1e6
+        label = factory_string(kind, cfg, min(n, cfg.ivf_train_size), dim)
+        print(
+            f"{label:<28}{build_s:>10.2f}{recall_at_k(found, truth):>10.3f}"
+            f"{ms_per_query:>10.3f}{size_mb:>10.1f}"
+        )
+
+        if kind in QUANTIZED_TYPES:
+            t_search = time.perf_counter()
+            _, candidates = index.search(query, k * cfg.vector_rerank_factor)
+            reranked = rerank(data, query, candidates, k)
+            ms_per_query = (time.perf_counter() - t_search) * 1000 / queries
+            print(
+                f"{'  + rerank x' + str(cfg.vector_rerank_factor):<28}{'':>10}"
+                f"{recall_at_k(reranked, truth):>10.3f}{ms_per_query:>10.3f}{'':>10}"
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index types on synthetic data.")
+    parser.add_argument("--n", type=int, default=100_000, help="Number of indexed vectors")
+    parser.add_argument("--dim", type=int, default=768, help="Vector dimension")
+    parser.add_argument("--queries", type=int, default=500, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query")
+    parser.add_argument("--types", type=str, default=",".join(INDEX_TYPES), help="Comma-separated index types")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(
+        Settings(),
+        [t.strip() for t in args.types.split(",") if t.strip()],
+        args.n,
+        args.dim,
+        args.queries,
+        args.k,
+        args.seed,
+    )
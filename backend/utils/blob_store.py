@@ -0,0 +1,88 @@
+import base64
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Set
+
+from backend.utils.persistence import atomic_write
+
+# Document.page_content of an image stored out of band: "blob:sha256:<hex digest>".
+BLOB_REF_PREFIX = "blob:sha256:"
+
+
+def is_blob_ref(content: str) -> bool:
+    return content.startswith(BLOB_REF_PREFIX)
+
+
+def blob_key(ref: str) -> str:
+    return ref[len(BLOB_REF_PREFIX):]
+
+
+class BlobStore:
+    """Content-addressed files for extracted figures, keyed by SHA-256 of their bytes.
+
+    Documents carry a short ``blob:sha256:...`` reference instead of a base64
+    payload; identical figures (logos, repeated diagrams) are stored once.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writers = 0
+        self._candidates: Set[str] = set()
+
+    def path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` and return its reference."""
+        key = hashlib.sha256(data).hexdigest()
+        path = self.path(key)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(path, data)
+        return BLOB_REF_PREFIX + key
+
+    def get(self, ref: str) -> Optional[bytes]:
+        try:
+            return self.path(blob_key(ref)).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def begin_write(self) -> None:
+        """Mark an ingest that may store or newly reference blobs; sweeps wait for it."""
+        with self._lock:
+            self._writers += 1
+
+    def end_write(self) -> None:
+        with self._lock:
+            self._writers -= 1
+
+    def remove_unreferenced(
+        self, refs: Iterable[str], referenced: Callable[[Set[str]], Set[str]]
+    ) -> int:
+        """Delete the blobs among ``refs`` (plus earlier deferred ones) nobody references.
+
+        ``referenced`` returns the subset still in use. While an ingest is
+        running the candidates are kept for the next sweep instead, since it
+        may be about to reference one of them. Returns the number removed.
+        """
+        with self._lock:
+            self._candidates.update(refs)
+            if self._writers or not self._candidates:
+                return 0
+            candidates, self._candidates = self._candidates, set()
+            removed = 0
+            for ref in candidates - referenced(candidates):
+                try:
+                    self.path(blob_key(ref)).unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def base64(self, ref: str) -> Optional[str]:
+        """Encode on demand, e.g. right before an image is sent to the vision model."""
+        data = self.get(ref)
+        return base64.b64encode(data).decode("ascii") if data is not None else None
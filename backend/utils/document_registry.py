@@ -0,0 +1,167 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from backend.utils.persistence import connect
+
+
+def hash_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of the file bytes, read in chunks so large PDFs are not loaded whole."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_hash(modality: str, content: str) -> str:
+    """Identity of a chunk across revisions of a file (page numbers may shift)."""
+    return hashlib.sha256(f"{modality}\0{content}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class DocumentRecord:
+    """One ingested file: where its chunks live and what produced them."""
+
+    file_hash: str
+    source: str
+    file_path: str
+    chunk_ids: List[str]
+    embedding_model: str
+    chat_model: str
+    summary_mode: str
+    # Chunking options the chunks were cut with (see PDFFileService.chunking_signature).
+    chunking: str = ""
+    # chunk hash -> doc_ids carrying that content (repeated chunks share a hash).
+    chunk_hashes: Dict[str, List[str]] = field(default_factory=dict)
+    response: Dict[str, Any] = field(default_factory=dict)
+    ingested_at: float = field(default_factory=time.time)
+
+
+class DocumentRegistry:
+    """SQLite registry of ingested documents keyed by file content hash."""
+
+    _COLUMNS = (
+        "file_hash, source, file_path, chunk_ids, embedding_model, chat_model, "
+        "summary_mode, chunking, chunk_hashes, response, ingested_at"
+    )
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                file_hash TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                embedding_model TEXT NOT NULL,
+                chat_model TEXT NOT NULL,
+                summary_mode TEXT NOT NULL,
+                chunking TEXT NOT NULL DEFAULT '',
+                chunk_hashes TEXT NOT NULL,
+                response TEXT NOT NULL,
+                ingested_at REAL NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+        if "chunking" not in columns:
+            # Registries written before chunking was recorded; now kept across restarts.
+            self._conn.execute(
+                "ALTER TABLE documents ADD COLUMN chunking TEXT NOT NULL DEFAULT ''"
+            )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_source ON documents (source)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS documents_file_path ON documents (file_path)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _from_row(row: tuple) -> DocumentRecord:
+        return DocumentRecord(
+            file_hash=row[0],
+            source=row[1],
+            file_path=row[2],
+            chunk_ids=json.loads(row[3]),
+            embedding_model=row[4],
+            chat_model=row[5],
+            summary_mode=row[6],
+            chunking=row[7],
+            chunk_hashes=json.loads(row[8]),
+            response=json.loads(row[9]),
+            ingested_at=row[10],
+        )
+
+    def get(self, file_hash: str) -> Optional[DocumentRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM documents WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def by_source(self, source: str) -> List[DocumentRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM documents WHERE source = ? ORDER BY ingested_at",
+                (source,),
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def by_file_path(self, *file_paths: str) -> List[DocumentRecord]:
+        """Records ingested from any of ``file_paths``, oldest first."""
+        marks = ", ".join("?" * len(file_paths))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM documents WHERE file_path IN ({marks}) "
+                "ORDER BY ingested_at",
+                file_paths,
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def referenced(self, chunk_hashes: Iterable[str]) -> Set[str]:
+        """The subset of ``chunk_hashes`` that some registered document still contains."""
+        wanted = set(chunk_hashes)
+        found: Set[str] = set()
+        with self._lock:
+            for (raw,) in self._conn.execute("SELECT chunk_hashes FROM documents"):
+                found.update(wanted.intersection(json.loads(raw)))
+        return found
+
+    def put(self, record: DocumentRecord) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO documents ({self._COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.file_hash,
+                    record.source,
+                    record.file_path,
+                    json.dumps(record.chunk_ids),
+                    record.embedding_model,
+                    record.chat_model,
+                    record.summary_mode,
+                    record.chunking,
+                    json.dumps(record.chunk_hashes),
+                    json.dumps(record.response),
+                    record.ingested_at,
+                ),
+            )
+
+    def delete(self, file_hashes: List[str]) -> None:
+        if not file_hashes:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM documents WHERE file_hash = ?", [(h,) for h in file_hashes]
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
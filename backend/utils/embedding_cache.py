@@ -0,0 +1,123 @@
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from backend.utils.persistence import connect, select_in
+
+
+class EmbeddingStore:
+    """SQLite table of float32 vectors keyed by hash(model, text)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[List[float]]]:
+        with self._lock:
+            rows = select_in(
+                self._conn, "SELECT key, vector FROM embeddings WHERE key IN ({marks})", keys
+            )
+        found: Dict[str, bytes] = dict(rows)
+        return [self._decode(found[k]) if k in found else None for k in keys]
+
+    def set_many(self, pairs: Sequence[Tuple[str, Sequence[float]]]) -> None:
+        if not pairs:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(k, array("f", v).tobytes()) for k, v in pairs],
+            )
+
+    @staticmethod
+    def _decode(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper: in-memory LRU for queries in front of a persistent store.
+
+    Documents and queries share the on-disk store, so a question that matches
+    an indexed summary verbatim is never embedded twice either.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model: str,
+        store: EmbeddingStore,
+        query_cache_size: int = 1024,
+    ) -> None:
+        self.underlying = underlying
+        self.model = model
+        self.store = store
+        self.query_cache_size = query_cache_size
+        self._queries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "document_hits": 0,
+            "document_misses": 0,
+            "query_memory_hits": 0,
+            "query_disk_hits": 0,
+            "query_misses": 0,
+        }
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "query_lru_size": len(self._queries)}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [EmbeddingStore.make_key(self.model, t) for t in texts]
+        vectors = self.store.get_many(keys)
+        misses = [idx for idx, v in enumerate(vectors) if v is None]
+        self._count("document_hits", len(texts) - len(misses))
+        self._count("document_misses", len(misses))
+        if misses:
+            fresh = self.underlying.embed_documents([texts[idx] for idx in misses])
+            for idx, vector in zip(misses, fresh):
+                vectors[idx] = vector
+            self.store.set_many([(keys[idx], vector) for idx, vector in zip(misses, fresh)])
+        return vectors  # type: ignore[return-value]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = EmbeddingStore.make_key(self.model, text)
+        with self._lock:
+            cached = self._queries.get(key)
+            if cached is not None:
+                self._queries.move_to_end(key)
+                self._stats["query_memory_hits"] += 1
+                return cached
+
+        vector = self.store.get_many([key])[0]
+        if vector is not None:
+            self._count("query_disk_hits")
+        else:
+            self._count("query_misses")
+            vector = self.underlying.embed_query(text)
+            self.store.set_many([(key, vector)])
+
+        with self._lock:
+            self._queries[key] = vector
+            while len(self._queries) > self.query_cache_size:
+                self._queries.popitem(last=False)
+        return vector
@@ -0,0 +1,44 @@
+import math
+import re
+from collections import Counter
+from typing import List
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by can for from has have if in into is it its
+    may more not of on or such than that the their then there these they this to
+    was were which will with would also we our you your he she his her them
+    """.split()
+)
+
+
+def _words(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS and len(w) > 1]
+
+
+def extractive_summary(text: str, max_sentences: int = 3) -> str:
+    """Pick the ``max_sentences`` most representative sentences, in original order.
+
+    Sentences are scored by the document frequency of their content words,
+    damped by sqrt(length) so long sentences do not win by size alone.
+    """
+    sentences = [s.strip() for s in _SENTENCE_SPLIT.split(text.strip()) if s.strip()]
+    if len(sentences) <= max_sentences:
+        return text.strip()
+
+    freq = Counter(_words(text))
+    if not freq:
+        return " ".join(sentences[:max_sentences])
+    top = max(freq.values())
+
+    def score(sentence: str) -> float:
+        words = _words(sentence)
+        if not words:
+            return 0.0
+        return sum(freq[w] / top for w in words) / math.sqrt(len(words))
+
+    ranked = sorted(range(len(sentences)), key=lambda i: score(sentences[i]), reverse=True)
+    keep = sorted(ranked[:max_sentences])
+    return " ".join(sentences[i] for i in keep)
@@ -0,0 +1,177 @@
+import logging
+import math
+from typing import Optional
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+from backend.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "hnsw", "ivf", "ivfpq", "sq8", "ivfsq8")
+# Compressed codes: searched approximately, then re-ranked on full-precision rows.
+QUANTIZED_TYPES = ("ivfpq", "sq8", "ivfsq8")
+IVF_TYPES = ("ivf", "ivfpq", "ivfsq8")
+
+
+def requires_training(kind: str) -> bool:
+    return kind not in ("flat", "hnsw")
+
+
+def pq_subquantizers(cfg: Settings, dim: int) -> int:
+    """Configured PQ_M, or the largest divisor of dim giving >= 8 dims per sub-vector."""
+    if cfg.pq_m > 0:
+        if dim % cfg.pq_m:
+            raise ValueError(f"PQ_M={cfg.pq_m} must divide the embedding dimension {dim}")
+        return cfg.pq_m
+    return max(m for m in range(1, max(1, dim // 8) + 1) if dim % m == 0)
+
+
+def ivf_nlist(cfg: Settings, n_train: int) -> int:
+    """Configured IVF list count, or ~4*sqrt(n) when IVF_NLIST is 0.
+
+    The automatic value is capped so k-means gets ~39 training points per list.
+    """
+    if cfg.ivf_nlist > 0:
+        return cfg.ivf_nlist
+    return max(1, min(65536, int(4 * math.sqrt(max(n_train, 1))), n_train // 39))
+
+
+def factory_string(kind: str, cfg: Settings, n_train: int = 0, dim: int = 0) -> str:
+    if kind == "flat":
+        return "Flat"
+    if kind == "hnsw":
+        return f"HNSW{cfg.hnsw_m},Flat"
+    if kind == "ivf":
+        return f"IVF{ivf_nlist(cfg, n_train)},Flat"
+    if kind == "ivfpq":
+        return f"IVF{ivf_nlist(cfg, n_train)},PQ{pq_subquantizers(cfg, dim)}x{cfg.pq_nbits}"
+    if kind == "sq8":
+        return "SQ8"
+    if kind == "ivfsq8":
+        return f"IVF{ivf_nlist(cfg, n_train)},SQ8"
+    raise ValueError(f"Unknown VECTOR_INDEX {kind!r}; expected one of {INDEX_TYPES}")
+
+
+def index_kind(index: faiss.Index) -> str:
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVFScalarQuantizer):
+        return "ivfsq8"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return "sq8"
+    return "flat"
+
+
+def is_quantized(index: faiss.Index) -> bool:
+    return index_kind(index) in QUANTIZED_TYPES
+
+
+def apply_search_params(index: faiss.Index, cfg: Settings) -> None:
+    """Set query-time knobs (efSearch / nprobe); they are not part of the vectors."""
+    kind = index_kind(index)
+    params = faiss.ParameterSpace()
+    if kind == "hnsw":
+        params.set_index_parameter(index, "efSearch", cfg.hnsw_ef_search)
+    elif kind in IVF_TYPES:
+        params.set_index_parameter(index, "nprobe", cfg.ivf_nprobe)
+
+
+def copy_search_params(source: faiss.Index, target: faiss.Index) -> None:
+    """Carry efSearch / nprobe over to a re-read copy of the same index."""
+    kind = index_kind(source)
+    if kind == "hnsw":
+        faiss.downcast_index(target).hnsw.efSearch = faiss.downcast_index(source).hnsw.efSearch
+    elif kind in IVF_TYPES:
+        faiss.extract_index_ivf(target).nprobe = faiss.extract_index_ivf(source).nprobe
+
+
+def enable_reconstruct(index: faiss.Index) -> None:
+    """IVF indexes need a direct map so vectors can be read back for rebuilds."""
+    if index_kind(index) in IVF_TYPES:
+        faiss.extract_index_ivf(index).set_direct_map_type(faiss.DirectMap.Hashtable)
+
+
+def create_index(
+    kind: str, dim: int, cfg: Settings, train_vectors: Optional[np.ndarray] = None
+) -> faiss.Index:
+    """Build an empty inner-product index of the given kind, trained if it needs to be."""
+    n_train = 0 if train_vectors is None else min(len(train_vectors), cfg.ivf_train_size)
+    index = faiss.index_factory(
+        dim, factory_string(kind, cfg, n_train, dim), faiss.METRIC_INNER_PRODUCT
+    )
+    if kind == "hnsw":
+        faiss.downcast_index(index).hnsw.efConstruction = cfg.hnsw_ef_construction
+    if not index.is_trained:
+        if train_vectors is None:
+            raise ValueError(f"{kind} index needs training vectors")
+        index.train(np.ascontiguousarray(train_vectors[: cfg.ivf_train_size], dtype=np.float32))
+    apply_search_params(index, cfg)
+    return index
+
+
+def initial_index(cfg: Settings, dim: int) -> faiss.Index:
+    """Index for an empty store: Flat until the migration threshold, unless the
+    target needs no training and VECTOR_INDEX_MIGRATE_AT is 0."""
+    kind = cfg.vector_index_type
+    if kind != "flat" and cfg.vector_index_migrate_at <= 0 and not requires_training(kind):
+        return create_index(kind, dim, cfg)
+    return faiss.IndexFlatIP(dim)
+
+
+def migrate_if_needed(store: FAISS, cfg: Settings) -> bool:
+    """Swap a Flat index for the configured ANN index once it is large enough.
+
+    Runs under the store's write lock; returns True when the index changed so
+    the caller can write a full snapshot.
+    """
+    target = cfg.vector_index_type
+    index = store.index
+    current = index_kind(index)
+    if current == target:
+        return False
+    if current != "flat":
+        logger.warning(
+            "Vector index is %s but VECTOR_INDEX=%s; only Flat indexes are migrated",
+            current,
+            target,
+        )
+        return False
+    if index.ntotal == 0 or index.ntotal < cfg.vector_index_migrate_at:
+        return False
+    minimum = cfg.min_training_vectors(target)
+    if index.ntotal < minimum:
+        # Training would raise inside the commit; wait for more vectors instead.
+        logger.warning(
+            "Deferring Flat -> %s migration: %d vectors, training needs %d",
+            target,
+            index.ntotal,
+            minimum,
+        )
+        return False
+
+    vectors = index.reconstruct_n(0, index.ntotal)
+    new_index = create_index(target, index.d, cfg, train_vectors=vectors)
+    new_index.add(vectors)
+    enable_reconstruct(new_index)
+    full_vectors = getattr(store, "full_vectors", None)
+    if full_vectors is not None and is_quantized(new_index):
+        # Keep exact copies on disk for re-ranking before the Flat vectors are dropped.
+        full_vectors.rewrite(
+            [store.index_to_docstore_id[i] for i in range(len(vectors))], vectors
+        )
+    store.index = new_index
+    logger.info(
+        "Migrated vector index Flat -> %s (%s) at %d vectors",
+        target,
+        factory_string(target, cfg, min(len(vectors), cfg.ivf_train_size), index.d),
+        new_index.ntotal,
+    )
+    return True
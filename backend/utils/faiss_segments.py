@@ -0,0 +1,263 @@
+import json
+import logging
+import pickle
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Set, Type
+
+import numpy as np
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from backend.utils.persistence import atomic_write
+from backend.utils.store_handle import ReadWriteLock
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so only threads of one process are serialised.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentLog:
+    """Append-only FAISS persistence: a base snapshot plus one segment file per ingest.
+
+    ``manifest.json`` names the current base directory (a ``save_local``
+    snapshot) and the segments written since. Appending costs only the new
+    vectors (and the ids deleted by that ingest); ``compact`` folds the
+    segments into a fresh base.
+
+    Several processes (uvicorn workers) may share ``root``. Every manifest
+    update holds an exclusive ``flock`` on ``.lock`` and re-reads the manifest
+    under it, so appends never clobber each other or reuse a file name. Each
+    process only knows the vectors it loaded or appended itself: compaction
+    folds just those segments, keeps the others, and is skipped once another
+    process has written a newer base. Other workers' ingests become
+    searchable in a process when it restarts.
+    """
+
+    MANIFEST = "manifest.json"
+    LOCK = ".lock"
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._compacting = threading.Lock()
+        self._mutex = threading.Lock()
+        self.manifest = self._read_manifest()
+        # What the store held by this process reflects: the base it loaded and
+        # the segments it replayed or appended.
+        self._base: Optional[str] = self.manifest["base"]
+        self._known: Set[str] = set()
+
+    @property
+    def segment_count(self) -> int:
+        return len(self.manifest["segments"])
+
+    def exists(self) -> bool:
+        return bool(self.manifest["base"] or self.manifest["segments"]) or self._legacy_index()
+
+    def _legacy_index(self) -> bool:
+        """A plain save_local snapshot written before segments existed."""
+        return (self.root / "index.faiss").exists()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        path = self.root / self.MANIFEST
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+        return {"version": 1, "base": None, "segments": [], "next_id": 1}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the cross-process manifest lock, with ``manifest`` re-read from disk."""
+        with self._mutex, (self.root / self.LOCK).open("a+b") as handle:
+            if fcntl is not None:
+                # Released when the handle closes.
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            self.manifest = self._read_manifest()
+            yield
+
+    def _write_manifest(self) -> None:
+        payload = json.dumps(self.manifest, indent=2).encode("utf-8")
+        atomic_write(self.root / self.MANIFEST, payload)
+
+    def _next_name(self, prefix: str) -> str:
+        name = f"{prefix}-{self.manifest['next_id']:06d}"
+        self.manifest["next_id"] += 1
+        return name
+
+    def append(
+        self,
+        ids: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        documents: Sequence[Document],
+        deleted: Sequence[str] = (),
+    ) -> None:
+        """Persist newly added vectors and deletions; caller holds the store's write lock."""
+        payload = {
+            "ids": list(ids),
+            "vectors": np.asarray(vectors, dtype=np.float32),
+            "texts": [d.page_content for d in documents],
+            "metadatas": [d.metadata for d in documents],
+            "deleted": list(deleted),
+        }
+        data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._locked():
+            name = self._next_name("segment") + ".pkl"
+            atomic_write(self.root / name, data)
+            self.manifest["segments"].append(name)
+            self._write_manifest()
+            self._known.add(name)
+
+    def load(
+        self,
+        embeddings: Embeddings,
+        build_empty: Callable[[], FAISS],
+        store_cls: Type[FAISS] = FAISS,
+        mmap: bool = False,
+    ) -> FAISS:
+        """Load the base snapshot (or an empty store) and replay segments on top.
+
+        With ``mmap`` the base index is memory-mapped when the store class
+        supports it. Replaying segments writes to the index, so pending ones
+        are first folded into a new base (``compact``), which is then mapped.
+        """
+        mmap = mmap and hasattr(store_cls, "load_mmap")
+        # Held throughout so another process cannot compact away the files being read.
+        with self._locked():
+            if mmap and self.manifest["segments"]:
+                store = self._replay(embeddings, build_empty, store_cls, mmap=False)
+                try:
+                    self._compact(store)
+                except OSError:
+                    logger.exception("Could not fold pending segments; serving them from memory")
+                    return store
+                del store  # drop the in-memory copy before mapping the new base
+            return self._replay(embeddings, build_empty, store_cls, mmap)
+
+    def _replay(
+        self,
+        embeddings: Embeddings,
+        build_empty: Callable[[], FAISS],
+        store_cls: Type[FAISS],
+        mmap: bool,
+    ) -> FAISS:
+        base = self.manifest["base"]
+        if base:
+            store = self._load_snapshot(self.root / base, embeddings, store_cls, mmap)
+        elif self._legacy_index():
+            store = self._load_snapshot(self.root, embeddings, store_cls, mmap)
+        else:
+            store = build_empty()
+        for name in self.manifest["segments"]:
+            with (self.root / name).open("rb") as f:
+                payload = pickle.load(f)
+            if payload["ids"]:
+                store.add_embeddings(
+                    list(zip(payload["texts"], payload["vectors"])),
+                    metadatas=payload["metadatas"],
+                    ids=payload["ids"],
+                )
+            if payload.get("deleted"):
+                store.delete(payload["deleted"])
+        self._base = base
+        self._known = set(self.manifest["segments"])
+        logger.info(
+            "Loaded vector store from %s (base=%s, segments=%d, vectors=%d, mmap=%s)",
+            self.root,
+            base,
+            self.segment_count,
+            store.index.ntotal,
+            getattr(store, "is_mmapped", False),
+        )
+        return store
+
+    @staticmethod
+    def _load_snapshot(
+        path: Path, embeddings: Embeddings, store_cls: Type[FAISS], mmap: bool = False
+    ) -> FAISS:
+        if mmap:
+            try:
+                return store_cls.load_mmap(str(path), embeddings, normalize_L2=True)
+            except RuntimeError:
+                # faiss builds differ in which index types they can map; read it instead.
+                logger.warning(
+                    "Could not memory-map %s; loading it into memory", path, exc_info=True
+                )
+        return store_cls.load_local(
+            str(path),
+            embeddings,
+            allow_dangerous_deserialization=True,
+            normalize_L2=True,
+        )
+
+    def compact(self, store: FAISS) -> None:
+        """Write a full snapshot and drop the segments it supersedes.
+
+        The caller must keep writers out (read lock or write lock) meanwhile,
+        and a memory-mapped store must already be materialized (write lock).
+        """
+        with self._compacting, self._locked():
+            self._compact(store)
+
+    def _compact(self, store: FAISS) -> None:
+        if self.manifest["base"] != self._base:
+            # Our store lacks that base's vectors; snapshotting it would lose them.
+            logger.warning(
+                "Skipping compaction of %s: another process wrote base %s after %s was loaded",
+                self.root,
+                self.manifest["base"],
+                self._base,
+            )
+            return
+        covered = [s for s in self.manifest["segments"] if s in self._known]
+        old_base = self._base
+        new_base = self._next_name("base")
+        store.save_local(str(self.root / new_base))
+        self.manifest["base"] = new_base
+        # Segments of other processes are not in this snapshot; they replay on top of it.
+        self.manifest["segments"] = [s for s in self.manifest["segments"] if s not in covered]
+        self._write_manifest()
+        self._base = new_base
+        self._known.difference_update(covered)
+        for name in covered:
+            (self.root / name).unlink(missing_ok=True)
+        if old_base:
+            shutil.rmtree(self.root / old_base, ignore_errors=True)
+        for legacy in ("index.faiss", "index.pkl"):
+            (self.root / legacy).unlink(missing_ok=True)
+        logger.info(
+            "Compacted vector store into %s (%d segments merged, %d kept, vectors=%d)",
+            new_base,
+            len(covered),
+            self.segment_count,
+            store.index.ntotal,
+        )
+
+    def maybe_compact_async(self, store: FAISS, lock: ReadWriteLock, threshold: int) -> None:
+        """Compact in a background thread once enough segments have piled up."""
+        # Only this process's own segments count: compaction cannot fold the others.
+        if threshold <= 0 or len(self._known) < threshold or self._compacting.locked():
+            return
+        if self.manifest["base"] != self._base:
+            return  # another process compacted since this one loaded; see compact()
+
+        def run() -> None:
+            try:
+                materialize = getattr(store, "materialize", None)
+                if materialize is not None:
+                    # Swaps store.index (a no-op after any ingest): searches must wait.
+                    with lock.write():
+                        materialize()
+                # Read side: searches continue, new ingests wait for the snapshot.
+                with lock.read():
+                    if len(self._known) >= threshold:
+                        self.compact(store)
+            except Exception:
+                logger.exception("Vector store compaction failed")
+
+        threading.Thread(target=run, name="faiss-compaction", daemon=True).start()
@@ -0,0 +1,287 @@
+import logging
+import math
+import pickle
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from backend.core.config import Settings
+from backend.utils.faiss_index import (
+    copy_search_params,
+    create_index,
+    enable_reconstruct,
+    index_kind,
+    is_quantized,
+    requires_training,
+)
+from backend.utils.full_vectors import FullPrecisionVectors
+
+logger = logging.getLogger(__name__)
+
+# Metadata flag on the docstore entry that replaces a deleted vector's document.
+TOMBSTONE = "_deleted"
+
+# IVF inverted lists are mapped rather than read. IO_FLAG_MMAP_IFC (faiss >= 1.8)
+# also maps Flat/SQ/HNSW code arrays, but combined with IO_FLAG_MMAP it makes
+# read_index fail on IVF files ("mmap only supported for File objects").
+_IO_FLAG_MMAP_IFC = getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+
+
+def mmap_flags(index_file: str) -> int:
+    """read_index flags for mapping ``index_file``, chosen from its header fourcc."""
+    with open(index_file, "rb") as f:
+        fourcc = f.read(4)
+    # Every IVF variant is serialised under an "Iw.." fourcc (IwFl, IwPQ, IwSq, ...).
+    if fourcc.startswith(b"Iw") or not _IO_FLAG_MMAP_IFC:
+        return faiss.IO_FLAG_MMAP
+    return _IO_FLAG_MMAP_IFC
+
+
+def purge_if_needed(store: FAISS, cfg: Settings) -> bool:
+    """Rebuild the index once tombstones reach VECTOR_TOMBSTONE_RATIO of it.
+
+    Runs under the store's write lock; returns True when the index changed so
+    the caller can write a full snapshot.
+    """
+    if not isinstance(store, RerankingFAISS) or cfg.vector_tombstone_ratio <= 0:
+        return False
+    ratio = store.tombstone_ratio
+    if ratio < cfg.vector_tombstone_ratio:
+        return False
+    purged = store.purge_tombstones(cfg)
+    logger.info(
+        "Rebuilt vector index without %d deleted entries (%.0f%% tombstoned, %d live)",
+        purged,
+        ratio * 100,
+        store.index.ntotal,
+    )
+    return True
+
+
+class RerankingFAISS(FAISS):
+    """FAISS store that re-ranks quantised-index candidates with exact scores.
+
+    With a PQ/SQ8 index the approximate search over-fetches
+    ``k * rerank_factor`` candidates, then scores them against the
+    full-precision rows in ``full_vectors``. For Flat/HNSW/IVF-Flat indexes
+    it behaves like ``FAISS``.
+
+    ``delete`` tombstones instead of removing: HNSW cannot remove vectors
+    and IVF removal renumbers ids behind ``index_to_docstore_id``. The
+    vector stays in the index, its docstore entry becomes a marker, and
+    searches over-fetch in proportion to the tombstoned share, drop marked
+    hits, and search again wider only when too few live hits remain.
+
+    ``load_mmap`` maps the index file instead of reading it, so workers
+    share its pages through the OS cache. A mapped index is read-only: it
+    is re-read into memory (``materialize``) before the first write.
+    """
+
+    full_vectors: Optional[FullPrecisionVectors] = None
+    rerank_factor: int = 4
+    _tombstones: Optional[Set[str]] = None
+    # (index file, index object) while the live index is still the mapped one.
+    _mmap_source: Optional[Tuple[str, Any]] = None
+
+    @classmethod
+    def load_mmap(
+        cls,
+        folder_path: str,
+        embeddings: Embeddings,
+        index_name: str = "index",
+        **kwargs: Any,
+    ) -> "RerankingFAISS":
+        """``load_local`` with the index memory-mapped; the pickle is trusted like there."""
+        path = Path(folder_path)
+        index_file = str(path / f"{index_name}.faiss")
+        index = faiss.read_index(index_file, mmap_flags(index_file))
+        with (path / f"{index_name}.pkl").open("rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        store = cls(embeddings, index, docstore, index_to_docstore_id, **kwargs)
+        store._mmap_source = (index_file, index)
+        return store
+
+    @property
+    def is_mmapped(self) -> bool:
+        # Migration or a tombstone purge replaces the index with an in-memory one.
+        return self._mmap_source is not None and self._mmap_source[1] is self.index
+
+    def materialize(self) -> None:
+        """Replace a memory-mapped index with an in-memory copy so it can be modified."""
+        if self.is_mmapped:
+            index = faiss.read_index(self._mmap_source[0])
+            copy_search_params(self.index, index)
+            self.index = index
+        self._mmap_source = None
+
+    def save_local(self, folder_path: str, index_name: str = "index") -> None:
+        # A mapped IVF index would be written as a reference to the file being replaced.
+        self.materialize()
+        super().save_local(folder_path, index_name)
+
+    @staticmethod
+    def is_tombstone(doc: Any) -> bool:
+        return isinstance(doc, Document) and bool(doc.metadata.get(TOMBSTONE))
+
+    @property
+    def tombstones(self) -> Set[str]:
+        if self._tombstones is None:
+            # Markers are pickled with the docstore, so rebuild the set after load_local.
+            self._tombstones = {
+                doc_id
+                for doc_id in self.index_to_docstore_id.values()
+                if self.is_tombstone(self.docstore.search(doc_id))
+            }
+        return self._tombstones
+
+    @property
+    def live_count(self) -> int:
+        return self.index.ntotal - len(self.tombstones)
+
+    @property
+    def tombstone_ratio(self) -> float:
+        return len(self.tombstones) / self.index.ntotal if self.index.ntotal else 0.0
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        known = set(self.index_to_docstore_id.values())
+        targets = [doc_id for doc_id in ids if doc_id in known and doc_id not in self.tombstones]
+        if not targets:
+            return False
+        self.docstore.delete(targets)
+        self.docstore.add(
+            {doc_id: Document(page_content="", metadata={TOMBSTONE: True}) for doc_id in targets}
+        )
+        self.tombstones.update(targets)
+        return True
+
+    def _fetch_size(self, n: int) -> int:
+        """Candidates to request so about ``n`` survive tombstone filtering.
+
+        Scales by the live fraction (at most 1/(1 - VECTOR_TOMBSTONE_RATIO))
+        plus a little slack, instead of adding every tombstone to each search.
+        """
+        dead = len(self.tombstones)
+        if not dead:
+            return n
+        total = self.index.ntotal
+        return min(total, math.ceil(n * total / max(1, total - dead)) + 8)
+
+    def _live_vectors(self, rows: List[int], ids: List[str]) -> np.ndarray:
+        if not rows:
+            return np.empty((0, self.index.d), dtype=np.float32)
+        if self._reranking() and len(self.full_vectors.known(ids)) == len(ids):
+            # Quantised codes reconstruct lossily; the on-disk rows are exact.
+            return self.full_vectors.get(ids)
+        return self.index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+
+    def purge_tombstones(self, cfg: Settings) -> int:
+        """Rebuild the index from live vectors only, dropping tombstoned entries.
+
+        Keeps the index type, except that a trained type (IVF/PQ/SQ8) falls
+        back to Flat below VECTOR_INDEX_MIGRATE_AT and migrates again later.
+        Runs under the store's write lock; returns the number of entries purged.
+        """
+        dead = self.tombstones
+        if not dead:
+            return 0
+        rows = sorted(
+            i for i, doc_id in self.index_to_docstore_id.items() if doc_id not in dead
+        )
+        ids = [self.index_to_docstore_id[i] for i in rows]
+        vectors = self._live_vectors(rows, ids)
+        kind = index_kind(self.index)
+        if requires_training(kind) and len(ids) < max(
+            1, cfg.vector_index_migrate_at, cfg.min_training_vectors(kind)
+        ):
+            kind = "flat"
+        index = create_index(kind, self.index.d, cfg, train_vectors=vectors)
+        index.add(vectors)
+        enable_reconstruct(index)
+        if self.full_vectors is not None and is_quantized(index):
+            self.full_vectors.rewrite(ids, vectors)
+        self.index = index
+        self.index_to_docstore_id = dict(enumerate(ids))
+        self.docstore.delete(list(dead))
+        self._tombstones = set()
+        return len(dead)
+
+    def _reranking(self) -> bool:
+        return self.full_vectors is not None and is_quantized(self.index)
+
+    def add_embeddings(
+        self,
+        text_embeddings: Iterable[Tuple[str, List[float]]],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        text_embeddings = list(text_embeddings)
+        self.materialize()
+        added = super().add_embeddings(text_embeddings, metadatas=metadatas, ids=ids, **kwargs)
+        if self._reranking():
+            self.full_vectors.append(added, [vector for _, vector in text_embeddings])
+        return added
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Any] = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        total = self.index.ntotal
+        if not self._reranking() or (filter is not None and not isinstance(filter, dict)):
+            n, n_fetch = self._fetch_size(k), self._fetch_size(fetch_k)
+            while True:
+                results = super().similarity_search_with_score_by_vector(
+                    embedding, k=n, filter=filter, fetch_k=n_fetch, **kwargs
+                )
+                live = [(doc, score) for doc, score in results if not self.is_tombstone(doc)]
+                # A short page means the index (or filter/threshold) ran out, not tombstones.
+                if len(live) >= k or len(results) < n or (n >= total and n_fetch >= total):
+                    return live[:k]
+                n, n_fetch = min(total, 2 * n), min(total, 2 * n_fetch)
+
+        query = np.array([embedding], dtype=np.float32)
+        faiss.normalize_L2(query)
+        wanted = max(k * max(1, self.rerank_factor), fetch_k if filter else 0)
+        n_candidates = self._fetch_size(wanted)
+        while True:
+            _, indices = self.index.search(query, n_candidates)
+            hits = [i for i in indices[0] if i != -1 and i in self.index_to_docstore_id]
+            doc_ids = [
+                self.index_to_docstore_id[i]
+                for i in hits
+                if self.index_to_docstore_id[i] not in self.tombstones
+            ]
+            if len(doc_ids) >= wanted or len(hits) < n_candidates or n_candidates >= total:
+                break
+            n_candidates = min(total, 2 * n_candidates)
+        doc_ids = self.full_vectors.known(doc_ids)
+        if not doc_ids:
+            return []
+
+        exact = self.full_vectors.get(doc_ids) @ query[0]
+        score_threshold = kwargs.get("score_threshold")
+        results: List[Tuple[Document, float]] = []
+        for pos in np.argsort(-exact):
+            score = float(exact[pos])
+            if score_threshold is not None and score < score_threshold:
+                break
+            doc = self.docstore.search(doc_ids[pos])
+            if not isinstance(doc, Document):
+                continue
+            if filter and any(doc.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            results.append((doc, score))
+            if len(results) == k:
+                break
+        return results
@@ -0,0 +1,95 @@
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import faiss
+import numpy as np
+
+from backend.utils.persistence import atomic_path
+
+
+class FullPrecisionVectors:
+    """Append-only, memory-mapped float32 copies of indexed vectors.
+
+    Quantised indexes keep only compressed codes in RAM; these rows live on
+    disk (shared through the OS page cache) and are read back only for the
+    handful of candidates being re-ranked. Rows are L2-normalised so a dot
+    product against a normalised query is the exact cosine score.
+    """
+
+    def __init__(self, root: Path, dim: int) -> None:
+        self.root = root
+        self.dim = dim
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.data_path = self.root / "vectors.f32"
+        self.ids_path = self.root / "vectors.ids"
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._mmap: Optional[np.memmap] = None
+        if self.ids_path.exists():
+            ids = self.ids_path.read_text(encoding="utf-8").splitlines()
+            # Rows past the last complete id line were never committed.
+            self._rows = {doc_id: row for row, doc_id in enumerate(ids)}
+            self._truncate(len(ids))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._rows
+
+    def _row_count(self) -> int:
+        if not self.data_path.exists():
+            return 0
+        return self.data_path.stat().st_size // (4 * self.dim)
+
+    def _truncate(self, rows: int) -> None:
+        if self.data_path.exists() and self._row_count() > rows:
+            with self.data_path.open("r+b") as f:
+                f.truncate(rows * 4 * self.dim)
+
+    def _normalised(self, vectors: Sequence[Sequence[float]]) -> np.ndarray:
+        data = np.array(vectors, dtype=np.float32).reshape(-1, self.dim)
+        faiss.normalize_L2(data)
+        return data
+
+    def append(self, ids: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        if not ids:
+            return
+        data = self._normalised(vectors)
+        with self._lock:
+            start = self._row_count()
+            with self.data_path.open("ab") as f:
+                f.write(data.tobytes())
+            # Ids are written last so a crash never exposes a missing row.
+            with self.ids_path.open("a", encoding="utf-8") as f:
+                f.write("".join(f"{doc_id}\n" for doc_id in ids))
+            for offset, doc_id in enumerate(ids):
+                self._rows[doc_id] = start + offset
+            self._mmap = None
+
+    def rewrite(self, ids: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Replace all rows, e.g. after a migration or a compacting rebuild."""
+        data = self._normalised(vectors) if len(ids) else np.empty((0, self.dim), np.float32)
+        with self._lock:
+            # The inner block (data) is replaced first, so ids never name missing rows.
+            with atomic_path(self.ids_path) as tmp_ids, atomic_path(self.data_path) as tmp_data:
+                tmp_data.write_bytes(data.tobytes())
+                tmp_ids.write_text("".join(f"{doc_id}\n" for doc_id in ids), encoding="utf-8")
+                self._mmap = None
+            self._rows = {doc_id: row for row, doc_id in enumerate(ids)}
+
+    def get(self, ids: Sequence[str]) -> np.ndarray:
+        """Rows for ``ids`` (all must be present), as an (n, dim) array."""
+        with self._lock:
+            if self._mmap is None:
+                rows = len(self._rows)
+                self._mmap = np.memmap(
+                    self.data_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+                ) if rows else None
+            if self._mmap is None:
+                return np.empty((0, self.dim), dtype=np.float32)
+            return np.asarray(self._mmap[[self._rows[doc_id] for doc_id in ids]])
+
+    def known(self, ids: Sequence[str]) -> List[str]:
+        return [doc_id for doc_id in ids if doc_id in self._rows]
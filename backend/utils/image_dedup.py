@@ -0,0 +1,87 @@
+import io
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from backend.core.config import Settings
+from backend.utils.image_prep import IMAGE_ERRORS
+
+
+@dataclass(frozen=True)
+class ImageFilterOptions:
+    """Which extracted figures are worth a vision call."""
+
+    dedup: bool = True
+    # dHash bits (of 64) two figures may differ by and still count as the same image.
+    max_distance: int = 4
+    # Smaller figures (icons, bullets, rules, spacer images) are dropped as decorative.
+    min_edge: int = 16
+    min_area: int = 64 * 64
+
+    @classmethod
+    def from_settings(cls, cfg: Settings) -> "ImageFilterOptions":
+        if not 0 <= cfg.image_dedup_max_distance <= 64:
+            raise ValueError(
+                f"IMAGE_DEDUP_MAX_DISTANCE must be in 0..64, got {cfg.image_dedup_max_distance}"
+            )
+        return cls(
+            dedup=cfg.image_dedup_enabled,
+            max_distance=cfg.image_dedup_max_distance,
+            min_edge=cfg.image_decorative_min_edge,
+            min_area=cfg.image_decorative_min_area,
+        )
+
+    def is_decorative(self, width: int, height: int) -> bool:
+        return min(width, height) < self.min_edge or width * height < self.min_area
+
+
+def dhash(img: Image.Image, size: int = 8) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a (size+1)x size thumbnail.
+
+    Robust to re-encoding, rescaling and small colour shifts, so the same logo
+    extracted at different resolutions on different pages hashes alike.
+    """
+    small = img.convert("L").resize((size + 1, size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def fingerprint(data: bytes) -> Optional[Tuple[int, int, int]]:
+    """(width, height, dHash) of an encoded image, or None when it cannot be decoded."""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            width, height = img.size
+            # JPEG decoders can scale down while decoding; the hash needs only 9x8 pixels.
+            img.draft("L", (64, 64))
+            return width, height, dhash(img)
+    except IMAGE_ERRORS:
+        return None
+
+
+class NearDuplicateIndex:
+    """Representatives seen so far, looked up by Hamming distance between dHashes."""
+
+    def __init__(self, max_distance: int) -> None:
+        self.max_distance = max_distance
+        self._exact: Dict[int, int] = {}
+        self._hashes: List[Tuple[int, int]] = []
+
+    def find(self, image_hash: int) -> Optional[int]:
+        """Key of the representative within ``max_distance`` bits, if any."""
+        key = self._exact.get(image_hash)
+        if key is not None or self.max_distance == 0:
+            return key
+        for seen, key in self._hashes:
+            if (seen ^ image_hash).bit_count() <= self.max_distance:
+                return key
+        return None
+
+    def add(self, image_hash: int, key: int) -> None:
+        self._exact.setdefault(image_hash, key)
+        self._hashes.append((image_hash, key))
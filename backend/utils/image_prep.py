@@ -0,0 +1,122 @@
+import io
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from backend.core.config import Settings
+
+# What decoding an extracted figure can raise: unreadable or truncated data, or
+# a scan past PIL's MAX_IMAGE_PIXELS (DecompressionBombError is not an OSError).
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+@dataclass(frozen=True)
+class ImagePrepOptions:
+    """How figures are shrunk before they are sent to the vision model."""
+
+    max_edge: int = 1024
+    jpeg_quality: int = 85
+    grayscale: bool = False
+    # Figures with fewer pixels than this are sent unchanged (re-encoding gains little).
+    min_area: int = 256 * 256
+
+    @classmethod
+    def from_settings(cls, cfg: Settings) -> Optional["ImagePrepOptions"]:
+        """None when IMAGE_PREP is off, so figures go to the model untouched."""
+        if not cfg.image_prep_enabled:
+            return None
+        if not 1 <= cfg.image_jpeg_quality <= 95:
+            raise ValueError(f"IMAGE_JPEG_QUALITY must be in 1..95, got {cfg.image_jpeg_quality}")
+        return cls(
+            max_edge=cfg.image_max_edge,
+            jpeg_quality=cfg.image_jpeg_quality,
+            grayscale=cfg.image_grayscale,
+            min_area=cfg.image_min_area,
+        )
+
+
+def prepare_image(data: bytes, mime_type: str, options: ImagePrepOptions) -> Tuple[bytes, str, int, int]:
+    """Downscale to ``max_edge`` and re-encode as JPEG.
+
+    Returns (bytes, mime type, pixels before, pixels after). The original is
+    returned when the figure is below ``min_area``, or when re-encoding would
+    not make it smaller and there is no resize or grayscale conversion to keep.
+    ``max_edge <= 0`` disables resizing.
+    """
+    mode = "L" if options.grayscale else "RGB"
+    with Image.open(io.BytesIO(data)) as img:
+        pixels = img.width * img.height
+        if pixels < options.min_area:
+            return data, mime_type, pixels, pixels
+        converts = options.grayscale and img.mode not in ("L", "1")
+        if options.max_edge > 0:
+            img.draft(mode, (options.max_edge, options.max_edge))
+        out = img.convert(mode)
+    if options.max_edge > 0 and max(out.size) > options.max_edge:
+        out.thumbnail((options.max_edge, options.max_edge), Image.LANCZOS)
+    buffer = io.BytesIO()
+    out.save(buffer, format="JPEG", quality=options.jpeg_quality, optimize=True)
+    encoded = buffer.getvalue()
+    if len(encoded) >= len(data) and out.width * out.height >= pixels and not converts:
+        return data, mime_type, pixels, pixels
+    return encoded, "image/jpeg", pixels, out.width * out.height
+
+
+class ImagePrepStats:
+    """Per-ingest totals for image preprocessing and the vision calls that follow."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.images = 0
+        self.resized = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.pixels_in = 0
+        self.pixels_out = 0
+        self.prep_seconds = 0.0
+        self.calls = 0
+        self.call_seconds = 0.0
+
+    def record(self, bytes_in: int, bytes_out: int, pixels_in: int, pixels_out: int, seconds: float) -> None:
+        with self._lock:
+            self.images += 1
+            self.resized += int(bytes_out != bytes_in or pixels_out != pixels_in)
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.pixels_in += pixels_in
+            self.pixels_out += pixels_out
+            self.prep_seconds += seconds
+
+    def record_call(self, seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.call_seconds += seconds
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            ratio = self.pixels_in / self.pixels_out if self.pixels_out else 1.0
+            return {
+                "images": self.images,
+                "resized": self.resized,
+                "mb_in": self.bytes_in / 1e6,
+                "mb_out": self.bytes_out / 1e6,
+                "saved_pct": 100.0 * (1 - self.bytes_out / self.bytes_in) if self.bytes_in else 0.0,
+                "mpx_in": self.pixels_in / 1e6,
+                "mpx_out": self.pixels_out / 1e6,
+                "prep_seconds": self.prep_seconds,
+                "call_seconds": self.call_seconds / self.calls if self.calls else 0.0,
+                # Upper bound: assumes vision latency grows linearly with pixels sent.
+                "est_saved_seconds": self.call_seconds * (ratio - 1),
+            }
+
+
+def timed_prepare(
+    data: bytes, mime_type: str, options: ImagePrepOptions, stats: ImagePrepStats
+) -> Tuple[bytes, str]:
+    started = time.perf_counter()
+    out, out_mime, pixels_in, pixels_out = prepare_image(data, mime_type, options)
+    stats.record(len(data), len(out), pixels_in, pixels_out, time.perf_counter() - started)
+    return out, out_mime
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Set, Tuple
+
+
+def _wake(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+class IngestClaims:
+    """Keys (file hashes, paths) held by ingests running in this process.
+
+    An ingest claims its content hash and its path before it looks at the
+    registry, so two uploads of the same bytes, or two versions of the same
+    file, run one after the other: the second sees the first one's record
+    instead of indexing alongside it. All keys are taken at once, so claims
+    cannot deadlock. Waiters park on a future of their own event loop (sync
+    ingests run on private loops), not on an executor thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._held: Set[str] = set()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @asynccontextmanager
+    async def claim(self, *keys: str) -> AsyncIterator[None]:
+        wanted = set(keys)
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if not self._held & wanted:
+                    self._held |= wanted
+                    break
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            # Woken on every release; loop round to check whether our keys are free.
+            await waiter
+        try:
+            yield
+        finally:
+            self._release(wanted)
+
+    def _release(self, keys: Set[str]) -> None:
+        with self._lock:
+            self._held -= keys
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # Its loop has closed; nobody is waiting on it any more.
+                pass
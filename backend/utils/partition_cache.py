@@ -0,0 +1,54 @@
+import gzip
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.utils.persistence import atomic_path
+
+
+def options_key(settings: Dict[str, Any]) -> str:
+    """Short stable key for a set of options (partitioning or chunking)."""
+    payload = json.dumps(settings, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class PartitionCache:
+    """Raw (pre-chunking) partition elements per file hash, as gzipped JSON dicts.
+
+    Layout: ``<root>/<file_hash>/<variant>.json.gz``, where the variant
+    hashes the partition options, so changing chunking parameters reuses the
+    entry while changing strategy or OCR options does not.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, file_hash: str, variant: str) -> Path:
+        return self.root / file_hash / f"{variant}.json.gz"
+
+    def get(self, file_hash: str, variant: str) -> Optional[List[Dict[str, Any]]]:
+        path = self._path(file_hash, variant)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                elements = json.load(f)
+        except (OSError, ValueError):
+            # Missing, truncated or corrupt entries are treated as a miss and rewritten.
+            return None
+        return elements
+
+    def put(self, file_hash: str, variant: str, elements: List[Dict[str, Any]]) -> None:
+        path = self._path(file_hash, variant)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_path(path) as tmp, gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(elements, f, separators=(",", ":"))
+
+    def discard(self, file_hash: str) -> bool:
+        """Drop every variant cached for a file; True if anything was removed."""
+        target = self.root / file_hash
+        if not target.exists():
+            return False
+        shutil.rmtree(target, ignore_errors=True)
+        return True
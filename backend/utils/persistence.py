@@ -0,0 +1,56 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence
+
+# Stay well below SQLite's bound-parameter limit on older builds.
+QUERY_CHUNK = 500
+
+
+def connect(path: Path, synchronous: Optional[str] = None) -> sqlite3.Connection:
+    """Open a WAL-mode SQLite database, creating its directory.
+
+    The connection is shared between threads; callers serialise access with
+    their own lock.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if synchronous is not None:
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+    return conn
+
+
+def select_in(conn: sqlite3.Connection, query: str, keys: Sequence[Any]) -> List[Any]:
+    """Rows of ``query`` for every key, issued ``QUERY_CHUNK`` keys at a time.
+
+    ``query`` contains one ``{marks}`` placeholder for the ``IN (...)`` list.
+    """
+    rows: List[Any] = []
+    for start in range(0, len(keys), QUERY_CHUNK):
+        batch = list(keys[start : start + QUERY_CHUNK])
+        marks = ",".join("?" * len(batch))
+        rows.extend(conn.execute(query.format(marks=marks), batch).fetchall())
+    return rows
+
+
+@contextmanager
+def atomic_path(path: Path) -> Iterator[Path]:
+    """Yield a temporary sibling of ``path`` that replaces it when the block succeeds.
+
+    The name is unique per process and thread, so concurrent writers of the
+    same file never share a temporary; readers see the old or the new file.
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    with atomic_path(path) as tmp:
+        tmp.write_bytes(data)
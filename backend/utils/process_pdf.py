@@ -1,23 +1,31 @@
 from pathlib import Path
 
-from backend.core.dependency import get_settings, get_vector_store, get_model, get_docstore
+from backend.core.dependency import (
+    get_docstore,
+    get_file_service,
+    get_model,
+    get_settings,
+    get_summary_cache,
+    get_store_handle,
+)
 from backend.servies.chat_service import ChatService
-from backend.servies.file_service import PDFFileService
 from backend.utils.logging import configure_logging
 
 
 def process_pdf(file_path: str) -> None:
     cfg = get_settings()
     configure_logging(cfg)
-    vector_store = get_vector_store(cfg)
+    handle = get_store_handle(cfg)
     model_service = get_model(cfg)
     docstore = get_docstore(cfg)
     service = ChatService(
         cfg=cfg,
-        vector_store=vector_store,
-        file_service=PDFFileService(),
+        vector_store=handle.store,
+        file_service=get_file_service(cfg),
         model_service=model_service,
         docstore=docstore,
+        store_lock=handle.lock,
+        summary_cache=get_summary_cache(cfg),
     )
     result = service.ingest(file_path)
     print(f"Ingested {file_path}: {result.chunks_indexed} chunks -> {result.vector_store_path}")
@@ -0,0 +1,97 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from langchain.schema import Document
+from langchain_core.stores import BaseStore
+
+from backend.utils.persistence import connect, select_in
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteDocStore(BaseStore[str, Document]):
+    """SQLite-backed docstore implementing the BaseStore interface.
+
+    Writes touch only the affected rows, so ingest cost no longer grows with
+    the size of the whole store the way a full JSON rewrite does.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect(self.path, synchronous="NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "key TEXT PRIMARY KEY, page_content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _to_row(key: str, doc: Document) -> Tuple[str, str, str]:
+        return key, doc.page_content, json.dumps(doc.metadata or {}, ensure_ascii=False)
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[Document]]:
+        with self._lock:
+            rows = select_in(
+                self._conn,
+                "SELECT key, page_content, metadata FROM documents WHERE key IN ({marks})",
+                keys,
+            )
+        found = {
+            key: Document(page_content=content, metadata=json.loads(meta))
+            for key, content, meta in rows
+        }
+        return [found.get(k) for k in keys]
+
+    def mset(self, key_value_pairs: Sequence[Tuple[str, Document]]) -> None:
+        rows = [self._to_row(k, v) for k, v in key_value_pairs]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (key, page_content, metadata) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def mdelete(self, keys: Sequence[str]) -> None:
+        if not keys:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM documents WHERE key = ?", [(k,) for k in keys]
+            )
+
+    def yield_keys(self, *, prefix: Optional[str] = None) -> Iterator[str]:
+        with self._lock:
+            if prefix is None:
+                rows = self._conn.execute("SELECT key FROM documents").fetchall()
+            else:
+                # Range scan on the primary key instead of an unindexable LIKE.
+                rows = self._conn.execute(
+                    "SELECT key FROM documents WHERE key >= ? AND key < ?",
+                    (prefix, prefix + "\U0010ffff"),
+                ).fetchall()
+        return (row[0] for row in rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+
+def migrate_json_docstore(json_path: Path, store: SqliteDocStore, batch_size: int = 500) -> int:
+    """One-shot import of a legacy docstore.json; the JSON file is renamed afterwards."""
+    if not json_path.exists():
+        return 0
+    raw = json.loads(json_path.read_text(encoding="utf-8"))
+    pairs = [
+        (k, Document(page_content=v["page_content"], metadata=v.get("metadata", {})))
+        for k, v in raw.items()
+    ]
+    for start in range(0, len(pairs), batch_size):
+        store.mset(pairs[start : start + batch_size])
+    json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+    logger.info("Migrated %d documents from %s to %s", len(pairs), json_path, store.path)
+    return len(pairs)
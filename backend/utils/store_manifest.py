@@ -0,0 +1,50 @@
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from backend.utils.persistence import atomic_write
+
+
+class StoreManifestMismatch(RuntimeError):
+    """Persisted vectors were built with a different embedding model or dimension."""
+
+
+@dataclass
+class StoreManifest:
+    """What the persisted vector store was built with, checked before a warm load."""
+
+    embedding_model: str
+    dim: int
+    created_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def read(cls, path: Path) -> Optional["StoreManifest"]:
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return cls(
+            embedding_model=data["embedding_model"],
+            dim=int(data["dim"]),
+            created_at=float(data.get("created_at", 0.0)),
+        )
+
+    def write(self, path: Path) -> None:
+        atomic_write(path, json.dumps(asdict(self), indent=2).encode("utf-8"))
+
+    def check(self, embedding_model: str, dim: int) -> None:
+        """Raise unless the store matches the configured model and the dimension it now produces."""
+        problems = []
+        if self.embedding_model != embedding_model:
+            problems.append(
+                f"embedding model {self.embedding_model!r} (configured {embedding_model!r})"
+            )
+        if self.dim != dim:
+            problems.append(f"dimension {self.dim} (configured model produces {dim})")
+        if problems:
+            raise StoreManifestMismatch(
+                "Persisted vector store was built with "
+                + " and ".join(problems)
+                + "; set RESET_STORES_ON_START=true to rebuild it."
+            )
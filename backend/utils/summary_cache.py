@@ -0,0 +1,44 @@
+import hashlib
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from backend.utils.persistence import connect, select_in
+
+
+class SummaryCache:
+    """SQLite-backed cache of LLM summaries keyed by content, modality, model and prompt."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content: str, modality: str, model: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (modality, model, prompt, content):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[str]]:
+        with self._lock:
+            rows = select_in(
+                self._conn, "SELECT key, summary FROM summaries WHERE key IN ({marks})", keys
+            )
+        found = dict(rows)
+        return [found.get(k) for k in keys]
+
+    def set_many(self, pairs: Sequence[Tuple[str, str]]) -> None:
+        if not pairs:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO summaries (key, summary) VALUES (?, ?)",
+                pairs,
+            )
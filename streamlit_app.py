@@ -6,6 +6,7 @@ Features:
 - Lightweight logging configured via backend settings/env.
 """
 
+import base64
 from pathlib import Path
 from typing import List, Tuple
 
@@ -14,12 +15,13 @@ from langchain.schema import Document
 
 from backend.core.dependency import (
     get_docstore,
+    get_file_service,
     get_model,
     get_settings,
-    get_vector_store,
+    get_summary_cache,
+    get_store_handle,
 )
 from backend.servies.chat_service import ChatService
-from backend.servies.file_service import PDFFileService
 from backend.servies.model_service import ModelService
 from backend.utils.logging import configure_logging
 
@@ -31,17 +33,19 @@ def bootstrap_services() -> Tuple[ChatService, Path]:
     cfg.ensure_dirs()
     configure_logging(cfg)
 
-    vector_store = get_vector_store(cfg)
+    handle = get_store_handle(cfg)
     docstore = get_docstore(cfg)
     model_service: ModelService = get_model(cfg)
-    file_service = PDFFileService()
+    file_service = get_file_service(cfg)
 
     chat_service = ChatService(
         cfg=cfg,
-        vector_store=vector_store,
+        vector_store=handle.store,
         file_service=file_service,
         model_service=model_service,
         docstore=docstore,
+        store_lock=handle.lock,
+        summary_cache=get_summary_cache(cfg),
     )
     return chat_service, cfg.upload_dir
 
@@ -60,6 +64,19 @@ def _metric(label: str, value: str) -> None:
     st.metric(label, value)
 
 
+def _stream_answer(chat_service: ChatService, question: str, top_k: int) -> Tuple[str, List]:
+    """Render tokens as they arrive; the finished turn is then shown via history."""
+    placeholder = st.empty()
+    with st.spinner("Retrieving..."):
+        events = chat_service.stream_answer(question, k=top_k)
+        _, context = next(events)
+    with placeholder.container():
+        st.markdown(f"**Q:** {question}")
+        answer = st.write_stream(data for event, data in events if event == "token")
+    placeholder.empty()
+    return str(answer), context
+
+
 def main() -> None:
     st.set_page_config(page_title="RAG QA Studio", layout="wide")
     st.title("RAG QA Studio")
@@ -80,8 +97,9 @@ def main() -> None:
             with st.spinner("Saving and ingesting..."):
                 pdf_path = _persist_upload(upload_dir, uploaded_file)
                 result = chat_service.ingest(str(pdf_path))
+            verb = "Already ingested" if result.duplicate else "Ingested"
             ingest_status.success(
-                f"Ingested {uploaded_file.name}: pages={result.processed_pages}, chunks={result.chunks_indexed}"
+                f"{verb} {uploaded_file.name}: pages={result.processed_pages}, chunks={result.chunks_indexed}"
             )
         except Exception as exc:  # pragma: no cover - UI flow
             ingest_status.error(f"Failed to ingest: {exc}")
@@ -94,16 +112,21 @@ def main() -> None:
     with col_k:
         top_k = st.slider("Top-K", min_value=1, max_value=10, value=4, step=1)
 
+    stream = st.checkbox("Stream answer", value=True)
     ask_btn = st.button("Ask", type="primary", disabled=not question.strip())
 
     if "history" not in st.session_state:
         st.session_state.history = []  # type: ignore
 
     if ask_btn and question.strip():
-        with st.spinner("Retrieving and generating..."):
-            response = chat_service.answer(question.strip(), k=top_k)
+        if stream:
+            answer, context = _stream_answer(chat_service, question.strip(), top_k)
+        else:
+            with st.spinner("Retrieving and generating..."):
+                response = chat_service.answer(question.strip(), k=top_k)
+            answer, context = response.answer, response.context
         st.session_state.history.append(
-            {"question": question.strip(), "answer": response.answer, "context": response.context}
+            {"question": question.strip(), "answer": answer, "context": context}
         )
 
     # Display chat history
@@ -115,7 +138,11 @@ def main() -> None:
             context: List = turn["context"]
             for i, ctx in enumerate(context, start=1):
                 page = f"p.{ctx.page_number}" if ctx.page_number is not None else "n/a"
-                st.markdown(f"- **Chunk {i} ({page})** — {ctx.text}")
+                if ctx.text.startswith("data:image/"):
+                    st.markdown(f"- **Chunk {i} ({page})** — image")
+                    st.image(base64.b64decode(ctx.text.split(",", 1)[1]))
+                else:
+                    st.markdown(f"- **Chunk {i} ({page})** — {ctx.text}")
 
         st.divider()
 
@@ -123,7 +150,10 @@ def main() -> None:
     with st.sidebar:
         st.subheader("Vector store")
         try:
-            ntotal = getattr(chat_service.vector_store.index, "ntotal", 0)
+            store = chat_service.vector_store
+            ntotal = getattr(store, "live_count", None)
+            if ntotal is None:
+                ntotal = getattr(store.index, "ntotal", 0)
         except Exception:
             ntotal = "unknown"
         _metric("Indexed chunks", str(ntotal))